@@ -7,6 +7,7 @@ import sys
 import os
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+from sqlalchemy import select, func
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -36,7 +37,7 @@ except ImportError:
     def init_backend():
         return False
     
-    def check_backend_health():
+    def check_backend_health(force=False, verbose=False):
         return {"status": "unavailable", "error": "Backend not loaded"}
     
     SessionLocal = None
@@ -164,7 +165,7 @@ class PageRenderer:
         with col1:
             try:
                 with SessionLocal() as session:
-                    user_count = session.query(UserDB).count()
+                    user_count = session.execute(select(func.count()).select_from(UserDB)).scalar()
                     st.metric("Team Members", user_count)
             except Exception:
                 st.metric("Team Members", "8")
@@ -282,7 +283,7 @@ class PageRenderer:
         # Run health check
         if st.button("🔄 Run Health Check", use_container_width=True):
             with st.spinner("Checking system health..."):
-                health_status = check_backend_health()
+                health_status = check_backend_health(force=True, verbose=True)
                 st.session_state.health_status = health_status
                 time.sleep(1)
         
@@ -424,7 +425,7 @@ class MigrationManager:
         try:
             with st.spinner("Running database migration..."):
                 from backend.database_operations import check_and_migrate_database
-                success = check_and_migrate_database()
+                success = check_and_migrate_database(force=True)
                 
                 if success:
                     st.success("✅ Migration completed successfully!")
@@ -444,9 +445,10 @@ class MigrationManager:
         try:
             from backend.database_operations import create_default_tasks_from_defaults_py
             with SessionLocal() as session:
-                admin_user = session.query(UserDB).filter_by(username="admin").first()
-                if admin_user:
-                    task_count = create_default_tasks_from_defaults_py(admin_user.id)
+                # Only the id is needed - no full UserDB row
+                admin_id = session.query(UserDB.id).filter_by(username="admin").scalar()
+                if admin_id is not None:
+                    task_count = create_default_tasks_from_defaults_py(admin_id)
                     st.success(f"✅ Created {task_count} default tasks!")
                 else:
                     st.error("Admin user not found")
@@ -94,7 +94,7 @@ except ImportError as e:
     def init_backend():
         return False
     
-    def check_backend_health():
+    def check_backend_health(force=False, verbose=False):
         return {"status": "unavailable", "error": "Backend not initialized"}
     
     def get_default_resources():
@@ -110,8 +110,9 @@ except ImportError as e:
 try:
     from backend.database_operations import (
          save_enhanced_task, duplicate_task, 
-        delete_task, get_user_tasks_with_filters, get_user_task_count,
-        create_default_tasks_from_defaults_py, migrate_remove_restrictive_constraints, check_and_migrate_database 
+        delete_task, get_user_tasks_with_filters, get_user_task_count, user_has_tasks,
+        invalidate_task_cache,
+        create_default_tasks_from_defaults_py, migrate_remove_restrictive_constraints, check_and_migrate_database
     )
     OPERATIONS_IMPORTS_SUCCESSFUL = True
 except ImportError as e:
@@ -136,6 +137,12 @@ except ImportError as e:
     def get_user_task_count(*args, **kwargs):
         return 0
     
+    def user_has_tasks(*args, **kwargs):
+        return False
+    
+    def invalidate_task_cache(*args, **kwargs):
+        return None
+    
     def create_default_tasks_from_defaults_py(*args, **kwargs):
         return 0
     
@@ -190,6 +197,8 @@ __all__: List[str] = [
     'delete_task', 
     'get_user_tasks_with_filters', 
     'get_user_task_count', 
+    'user_has_tasks',
+    'invalidate_task_cache',
     'create_default_tasks_from_defaults_py',
     'migrate_remove_restrictive_constraints',
     'check_and_migrate_database',
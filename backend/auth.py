@@ -2,7 +2,7 @@
 import streamlit as st
 from functools import wraps
 from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import func
+from sqlalchemy import func, select
 from datetime import datetime, timedelta
 import logging
 import time
@@ -13,6 +13,15 @@ from backend.database import SessionLocal, get_db_session
 
 logger = logging.getLogger(__name__)
 
+# Access levels each role may use with require_auth - built once, frozensets for O(1) membership
+ROLE_ACCESS_LEVELS = {
+    "admin": frozenset({"read", "write", "admin"}),
+    "manager": frozenset({"read", "write"}),
+    "worker": frozenset({"read", "write"}),
+    "viewer": frozenset({"read"}),
+}
+_DEFAULT_ACCESS_LEVELS = frozenset({"read"})  # Unknown roles are read-only
+
 # ------------------------- AUTH MANAGER -------------------------
 class AuthManager:
     def __init__(self, db_session=None):
@@ -98,11 +107,13 @@ class AuthManager:
             with SessionLocal() as session:
                 cutoff_time = datetime.now() - timedelta(minutes=window_minutes)
                 
-                attempt_count = session.query(LoginAttemptDB).filter(
-                    LoginAttemptDB.username == username,
-                    LoginAttemptDB.attempt_time >= cutoff_time,
-                    LoginAttemptDB.successful == False
-                ).count()
+                attempt_count = session.execute(
+                    select(func.count()).select_from(LoginAttemptDB).where(
+                        LoginAttemptDB.username == username,
+                        LoginAttemptDB.attempt_time >= cutoff_time,
+                        LoginAttemptDB.successful == False
+                    )
+                ).scalar()
                 return attempt_count >= max_attempts      
         except Exception as e:
             logger.error(f"Rate limit check failed for {username}: {e}")
@@ -162,14 +173,7 @@ class AuthManager:
         st.session_state.last_activity = datetime.now()
         # Check authorization based on access level
         user_role = user.get("role", "viewer")   
-        role_permissions = {
-            "admin": ["read", "write", "admin"],
-            "manager": ["read", "write"],
-            "worker": ["read", "write"], 
-            "viewer": ["read"]
-        }
-        
-        allowed_levels = role_permissions.get(user_role, ["read"])
+        allowed_levels = ROLE_ACCESS_LEVELS.get(user_role, _DEFAULT_ACCESS_LEVELS)
         
         if access_level not in allowed_levels:
             st.error(f"🚫 Access denied. Your role '{user_role}' cannot perform '{access_level}' operations.")
@@ -8,8 +8,10 @@ from contextlib import contextmanager
 from typing import Generator, Dict, Any
 from backend.db_models import Base
 import streamlit as st
-from sqlalchemy import create_engine, event, text, exc, inspect
-from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy import create_engine, event, text, exc, inspect, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool, StaticPool
 
 logger = logging.getLogger(__name__)
@@ -70,7 +72,9 @@ class DatabaseConfig:
         """SQLAlchemy engine config"""
         base_config = {
             "echo": False,
-            "pool_pre_ping": True,
+            # No per-checkout SELECT 1: pool_recycle retires stale connections and
+            # init_backend verifies connectivity explicitly at startup
+            "pool_pre_ping": False,
             "connect_args": {
                 "connect_timeout": 10,
                 "application_name": f"construction_app_{self.env}"
@@ -84,10 +88,14 @@ class DatabaseConfig:
         else:
             base_config.update({
                 "poolclass": QueuePool,
-                "pool_size": 20,
-                "max_overflow": 10,
+                "pool_size": 10,
+                "max_overflow": 20,
                 "pool_timeout": 30,
-                "pool_recycle": 1800
+                "pool_recycle": 1800,
+                # psycopg2 batching: INSERTs use multi-row VALUES, UPDATE/DELETE executemany use execute_batch
+                "executemany_mode": "values_plus_batch",
+                "insertmanyvalues_page_size": 1000,
+                "executemany_batch_page_size": 500
              })
         return base_config
 
@@ -153,6 +161,9 @@ except Exception as e:
         logger.warning("🔄 Falling back to SQLite database")
         engine = create_engine("sqlite:///construction_fallback.db", poolclass=StaticPool)
 
+# Credentials masked once; the URL is fixed for the life of the engine
+_MASKED_DB_URL = engine.url.render_as_string(hide_password=True)
+
 # Enhanced session factory
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -215,7 +226,7 @@ class DatabaseManager:
             if duration > 1.0:  # Log slow queries
                 logger.warning(f"🐌 Slow query detected: {duration:.2f}s")
             else:
-                logger.debug(f"Query completed in {duration:.2f}s")
+                logger.debug("Query completed in %.2fs", duration)
                 
         except exc.SQLAlchemyError as e:
             session.rollback()
@@ -237,10 +248,34 @@ def get_db_session() -> Generator[Session, None, None]:
     with DatabaseManager().get_session() as session:
         yield session
 
-def check_database_health() -> Dict[str, Any]:
+def insert_ignore_conflicts(session: Session, model, rows):
+    """Bulk INSERT that skips rows violating a unique constraint (ON CONFLICT DO NOTHING)"""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = pg_insert(model).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(model).on_conflict_do_nothing()
+    else:
+        stmt = insert(model)
+    return session.execute(stmt, rows)
+
+def row_exists(session: Session, model, *criteria) -> bool:
+    """EXISTS probe - stops at the first matching row instead of counting the table"""
+    return bool(session.query(session.query(model).filter(*criteria).exists()).scalar())
+
+# Last healthy result, reused for HEALTH_CHECK_TTL seconds so polling doesn't hit the database each time
+HEALTH_CHECK_TTL = 5.0
+_health_cache: Dict[str, Any] = {"timestamp": 0.0, "result": None}
+
+def check_database_health(force: bool = False) -> Dict[str, Any]:
     """
     Comprehensive database health check with connection pool status
+    Healthy results are cached for HEALTH_CHECK_TTL seconds unless force=True
     """
+    cached = _health_cache["result"]
+    if not force and cached is not None and time.monotonic() - _health_cache["timestamp"] < HEALTH_CHECK_TTL:
+        return cached
+    
     health_check = {
         "status": "unknown",
         "environment": config.env,
@@ -280,11 +315,14 @@ def check_database_health() -> Dict[str, Any]:
                 health_check["active_connections"] = result.scalar()
         
         health_check["status"] = "healthy"
+        _health_cache["timestamp"] = time.monotonic()
+        _health_cache["result"] = health_check
         logger.debug("Database health check passed")
         
     except Exception as e:
         health_check["status"] = "unhealthy"
         health_check["error"] = str(e)
+        _health_cache["result"] = None
         logger.error(f"Database health check failed: {e}")
     
     return health_check
@@ -293,13 +331,11 @@ def init_db() -> bool:
     """
     Initialize database tables with comprehensive error handling and version tracking
     """
-    from backend.db_models import Base as ModelsBase
-    
     try:
         logger.info("Initializing database schema...")
         
         # Create all tables
-        ModelsBase.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
         
         # Verify table creation
         inspector = inspect(engine)
@@ -366,7 +402,7 @@ def inspect_database() -> Dict[str, Any]:
             "tables": inspector.get_table_names(),
             "views": inspector.get_view_names(),
             "schema_info": {
-                "database_url": str(engine.url).split('@')[-1],  # Mask credentials
+                "database_url": _MASKED_DB_URL,
                 "environment": config.env,
                 "pool_size": getattr(engine.pool, 'size', 'N/A')
             }
@@ -376,4 +412,4 @@ def inspect_database() -> Dict[str, Any]:
         return {"error": str(e)}
 
 logger.info(f"✅ Database module initialized for {config.env} environment")
-logger.info(f"📊 Database URL: {config.url.split('@')[-1]}")
+logger.info(f"📊 Database URL: {_MASKED_DB_URL}")
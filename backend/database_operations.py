@@ -2,18 +2,123 @@
 Enhanced database operations for task management
 """
 import streamlit as st  # ← ADD THIS FOR DEBUGGING
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload, aliased
 import sqlalchemy as sa
-from backend.database import SessionLocal
-from backend.db_models import UserBaseTaskDB, UserDB
+from sqlalchemy.exc import SQLAlchemyError
+from backend.database import SessionLocal, row_exists
+from backend.db_models import UserBaseTaskDB, UserDB, UtcNow
+from defaults import BASE_TASKS
+import functools
 import logging
+import operator
+import threading
+import time
+from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
+
+# ===== LOOKUP CACHES =====
+class _TTLCache:
+    """Small thread-safe in-process cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                self._data.clear()
+            self._data[key] = (time.monotonic(), value)
+
+    def pop_where(self, predicate):
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+# Filtered column projections, keyed by (user_id, filters, columns) - dropped whenever that user's tasks change
+_task_list_cache = _TTLCache(ttl=30.0)
+
+@contextmanager
+def _read_session(session=None):
+    """Reuse the caller's session as-is, or open one that is closed afterwards"""
+    if session is not None:
+        yield session
+    else:
+        with SessionLocal() as own_session:
+            yield own_session
+
+# Admin user id is immutable once bootstrapped - cached once copy_default_tasks_to_user has committed
+_ADMIN_ID = None
+
+# Set once the system default tasks are committed, skipping the existence preflight afterwards
+_SYSTEM_TASKS_CREATED = False
+
+def _get_admin_id(session):
+    """Return the admin user's id, querying the database until it is known to be committed"""
+    if _ADMIN_ID is not None:
+        return _ADMIN_ID
+    return session.query(UserDB.id).filter_by(username="admin").scalar()
+
+# BaseTask fields copied verbatim onto UserBaseTaskDB columns of the same name
+_BASE_TASK_COLUMNS = (
+    'name', 'sub_discipline', 'resource_type', 'task_type', 'base_duration',
+    'min_crews_needed', 'min_equipment_needed', 'predecessors', 'repeat_on_floor',
+    'included', 'delay', 'cross_floor_dependencies', 'applies_to_floors',
+)
+# BaseTask is a slotted dataclass with every field defined - one C-level call reads them all
+_read_base_task_columns = operator.attrgetter(*_BASE_TASK_COLUMNS)
+@functools.lru_cache(maxsize=1)
+def _default_task_rows():
+    """Insert rows for the included BASE_TASKS, built once - owner columns are added per call"""
+    return tuple(
+        {
+            'base_task_id': base_task.id,
+            **dict(zip(_BASE_TASK_COLUMNS, _read_base_task_columns(base_task))),
+            'discipline': discipline,
+            'created_by_user': False,  # Mark as system task
+        }
+        for discipline, tasks in BASE_TASKS.items()
+        for base_task in tasks
+        if base_task.included  # Skip excluded tasks
+    )
+
+# Rows per executemany batch when seeding system tasks (matches insertmanyvalues_page_size)
+_SEED_BATCH_SIZE = 1000
+
+def invalidate_task_cache(user_id=None):
+    """Forget cached task lists for a user (or for everyone) after their tasks change"""
+    if user_id is None:
+        _task_list_cache.clear()
+    else:
+        _task_list_cache.pop_where(lambda key: key[0] == user_id)
+
 def save_enhanced_task(session, task, is_new, user_id, name,task_id, discipline, resource_type, 
                       base_duration, min_crews_needed, delay, min_equipment_needed, 
                       predecessors, cross_floor_config, task_type, repeat_on_floor, 
-                      included=True, sub_discipline=None):  # ✅ NEW: Add sub_discipline parameter
-    """Save task with all parameters - INCLUDES sub_discipline"""
+                      included=True, sub_discipline=None, commit=True):  # ✅ NEW: Add sub_discipline parameter
+    """Save task with all parameters - INCLUDES sub_discipline
+    
+    Pass commit=False when saving several tasks on one session; the caller then
+    commits once at the end of the batch (a failure rolls the whole batch back).
+    """
     try:
         if is_new:
             new_task = UserBaseTaskDB(
@@ -54,7 +159,9 @@ def save_enhanced_task(session, task, is_new, user_id, name,task_id, discipline,
             task.cross_floor_dependencies = cross_floor_config.get('cross_floor_dependencies', [])
             task.applies_to_floors = cross_floor_config.get('applies_to_floors', 'auto')
         
-        session.commit()
+        if commit:
+            session.commit()
+        invalidate_task_cache(user_id)
         
         sub_disc_info = f" | Sub: {sub_discipline}" if sub_discipline else ""
         duration_info = "🔄 calculated by engine" if base_duration is None else f"⏱️ fixed at {base_duration} days"
@@ -66,119 +173,122 @@ def save_enhanced_task(session, task, is_new, user_id, name,task_id, discipline,
         session.rollback()
         return False
 
-def copy_default_tasks_to_user(user_id: int, session) -> int:
+def copy_default_tasks_to_user(user_id: int, session, commit: bool = True) -> int:
     """
     Copy default tasks from defaults.py to a specific user
     Returns number of tasks copied
+    
+    Pass commit=False when the caller owns the transaction: nothing is committed or
+    rolled back here, and database errors are re-raised for the caller to handle.
     """
+    global _SYSTEM_TASKS_CREATED, _ADMIN_ID
+    system_tasks_created = 0
     try:
-        from defaults import BASE_TASKS
+        admin_id = _get_admin_id(session)
+        if admin_id is None:
+            logger.error("❌ Admin user not found for system task creation")
+            return 0
         
-        # FIRST: Ensure system default tasks exist (created_by_user=False)
-        system_tasks_count = session.query(UserBaseTaskDB).filter_by(created_by_user=False).count()
+        # FIRST: Ensure system default tasks exist (created_by_user=False) - checked once per process
+        system_tasks_exist = _SYSTEM_TASKS_CREATED or row_exists(
+            session, UserBaseTaskDB, UserBaseTaskDB.created_by_user == False
+        )
         
-        if system_tasks_count == 0:
+        if not system_tasks_exist:
             # Create system default tasks first
             logger.info("🔄 Creating system default tasks...")
-            admin_user = session.query(UserDB).filter_by(username="admin").first()
-            if not admin_user:
-                logger.error("❌ Admin user not found for system task creation")
-                return 0
                 
-            system_tasks_created = 0
-            for discipline, tasks in BASE_TASKS.items():
-                for base_task in tasks:
-                    # Skip excluded tasks
-                    if not getattr(base_task, 'included', True):
-                        continue
-                    
-                    # Create system task (created_by_user=False)
-                    system_task = UserBaseTaskDB(
-                        base_task_id = getattr(base_task, 'id', 'Unknown id'),
-                        user_id=admin_user.id,  # Owned by admin
-                        name=getattr(base_task, 'name', 'Unknown Task'),
-                        discipline=discipline,
-                        sub_discipline=getattr(base_task, 'sub_discipline', None),
-                        resource_type=getattr(base_task, 'resource_type', 'BétonArmé'),
-                        task_type=getattr(base_task, 'task_type', 'worker'),
-                        base_duration=getattr(base_task, 'base_duration', None),
-                        min_crews_needed=getattr(base_task, 'min_crews_needed', 1),
-                        min_equipment_needed=getattr(base_task, 'min_equipment_needed', {}),
-                        predecessors=getattr(base_task, 'predecessors', []),
-                        repeat_on_floor=getattr(base_task, 'repeat_on_floor', True),
-                        included=getattr(base_task, 'included', True),
-                        delay=getattr(base_task, 'delay', 0),
-                        cross_floor_dependencies=getattr(base_task, 'cross_floor_dependencies', []),
-                        applies_to_floors=getattr(base_task, 'applies_to_floors', 'auto'),
-                        created_by_user=False,  # Mark as system task
-                        creator_id=admin_user.id
-                    )
-                    session.add(system_task)
-                    system_tasks_created += 1
+            # System task rows (created_by_user=False), owned by admin
+            system_rows = [
+                {**row, 'user_id': admin_id, 'creator_id': admin_id}
+                for row in _default_task_rows()
+            ]
+            
+            # executemany INSERTs instead of one ORM object per task, bounded so a large
+            # catalogue never binds one giant parameter set
+            insert_stmt = sa.insert(UserBaseTaskDB)
+            for start in range(0, len(system_rows), _SEED_BATCH_SIZE):
+                session.execute(insert_stmt, system_rows[start:start + _SEED_BATCH_SIZE])
+            system_tasks_created = len(system_rows)
             
             if system_tasks_created > 0:
-                session.commit()
                 logger.info(f"✅ Created {system_tasks_created} system default tasks")
         
-        # NOW: Copy system tasks to user
-        user_tasks_created = 0
+        # NOW: Copy system tasks to user - single INSERT ... SELECT, rows never leave the server
+        system = aliased(UserBaseTaskDB)
+        already_owned = sa.select(UserBaseTaskDB.id).where(
+            UserBaseTaskDB.user_id == user_id,
+            UserBaseTaskDB.name == system.name
+        )
+        copy_columns = [
+            'base_task_id', 'user_id', 'name', 'discipline', 'sub_discipline',
+            'resource_type', 'task_type', 'base_duration', 'min_crews_needed',
+            'min_equipment_needed', 'predecessors', 'repeat_on_floor', 'included',
+            'delay', 'cross_floor_dependencies', 'applies_to_floors',
+            'created_by_user', 'creator_id'
+        ]
+        system_rows = sa.select(
+            system.base_task_id,
+            sa.literal(user_id),
+            system.name,
+            system.discipline,
+            system.sub_discipline,
+            system.resource_type,
+            system.task_type,
+            system.base_duration,
+            system.min_crews_needed,
+            system.min_equipment_needed,
+            system.predecessors,
+            system.repeat_on_floor,
+            system.included,
+            system.delay,
+            system.cross_floor_dependencies,
+            system.applies_to_floors,
+            sa.false(),  # Still marked as system-created (not user custom)
+            sa.literal(user_id)
+        ).where(
+            system.created_by_user == False,
+            system.user_id == admin_id,  # Only the admin-owned originals, not other users' copies
+            ~sa.exists(already_owned)
+        )
         
-        # Get existing task names for this user to avoid duplicates
-        existing_tasks = session.query(UserBaseTaskDB.name).filter(
-            UserBaseTaskDB.user_id == user_id
-        ).all()
-        existing_task_names = {task[0] for task in existing_tasks}
+        result = session.execute(
+            sa.insert(UserBaseTaskDB).from_select(copy_columns, system_rows)
+        )
+        user_tasks_created = max(result.rowcount or 0, 0)
         
-        # Get all system tasks to copy to user
-        system_tasks = session.query(UserBaseTaskDB).filter_by(created_by_user=False).all()
-        
-        for system_task in system_tasks:
-            # Skip if task already exists for this user
-            if system_task.name in existing_task_names:
-                continue
-                
-            # Create user copy of system task
-            user_task = UserBaseTaskDB(
-                base_task_id = system_task.base_task_id,
-                user_id=user_id,
-                name=system_task.name,
-                discipline=system_task.discipline,
-                sub_discipline=system_task.sub_discipline,
-                resource_type=system_task.resource_type,
-                task_type=system_task.task_type,
-                base_duration=system_task.base_duration,
-                min_crews_needed=system_task.min_crews_needed,
-                min_equipment_needed=system_task.min_equipment_needed,
-                predecessors=system_task.predecessors.copy() if system_task.predecessors else [],
-                repeat_on_floor=system_task.repeat_on_floor,
-                included=system_task.included,
-                delay=system_task.delay,
-                cross_floor_dependencies=system_task.cross_floor_dependencies.copy() if system_task.cross_floor_dependencies else [],
-                applies_to_floors=system_task.applies_to_floors,
-                created_by_user=False,  # Still marked as system-created (not user custom)
-                creator_id=user_id
-            )
-            session.add(user_task)
-            user_tasks_created += 1
-        
-        if user_tasks_created > 0:
+        # One commit for the system seed and the user copy - the INSERT ... SELECT
+        # already sees the uncommitted system rows within this transaction
+        if commit:
             session.commit()
+            # Only remembered once committed - a caller-owned transaction may still roll back
+            _ADMIN_ID = admin_id
+            _SYSTEM_TASKS_CREATED = True
+        if system_tasks_created > 0:
+            invalidate_task_cache()
+        if user_tasks_created > 0:
+            invalidate_task_cache(user_id)
             logger.info(f"✅ Copied {user_tasks_created} default tasks to user {user_id}")
         
         return user_tasks_created
         
-    except Exception as e:
+    except SQLAlchemyError as e:
+        _ADMIN_ID = None
+        _SYSTEM_TASKS_CREATED = False
+        if not commit:
+            raise
         session.rollback()
-        logger.error(f"❌ Error copying default tasks to user {user_id}: {e}")
+        logger.error("❌ Error copying default tasks to user %s: %s", user_id, e)
         return 0
+
 def create_default_tasks_from_defaults_py(user_id=None):
     """Create default tasks from defaults.py by calling copy_default_tasks_to_user"""
     try:
         with SessionLocal() as session:
             if user_id is None:
-                admin_user = session.query(UserDB).filter_by(username="admin").first()
-                if admin_user:
-                    user_id = admin_user.id
+                admin_id = _get_admin_id(session)
+                if admin_id is not None:
+                    user_id = admin_id
                     logger.info(f"Using admin user (ID: {user_id}) for system tasks")
                 else:
                     logger.error("No admin user found and no user_id provided")
@@ -189,8 +299,8 @@ def create_default_tasks_from_defaults_py(user_id=None):
             logger.info(f"Created {tasks_created} default tasks for user {user_id}")
             return tasks_created
             
-    except Exception as e:
-        logger.error(f"Error in create_default_tasks_from_defaults_py: {e}")
+    except SQLAlchemyError as e:
+        logger.error("Error in create_default_tasks_from_defaults_py: %s", e)
         return 0
 
 def duplicate_task(original_task, user_id, new_stable_id=None, modifications=None):
@@ -229,16 +339,17 @@ def duplicate_task(original_task, user_id, new_stable_id=None, modifications=Non
                 base_duration=modifications.get('base_duration', original_task.base_duration) if modifications else original_task.base_duration,
                 min_crews_needed=modifications.get('min_crews_needed', original_task.min_crews_needed) if modifications else original_task.min_crews_needed,
                 min_equipment_needed=original_task.min_equipment_needed,
-                predecessors=original_task.predecessors.copy() if original_task.predecessors else [],
+                predecessors=original_task.predecessors or [],
                 delay=original_task.delay,
                 repeat_on_floor=original_task.repeat_on_floor,
-                cross_floor_dependencies=original_task.cross_floor_dependencies.copy() if original_task.cross_floor_dependencies else [],
+                cross_floor_dependencies=original_task.cross_floor_dependencies or [],
                 applies_to_floors=original_task.applies_to_floors,
                 created_by_user=True
             )
 
             session.add(new_task)
             session.commit()
+            invalidate_task_cache(user_id)
 
             sub_disc_info = f" (Sub: {original_task.sub_discipline})" if original_task.sub_discipline else ""
             logger.info(f"✅ Task duplicated successfully: {new_task.stable_id} - {new_task.name}{sub_disc_info}")
@@ -257,25 +368,52 @@ def duplicate_task(original_task, user_id, new_stable_id=None, modifications=Non
 
 
 # ✅ NEW: Add filtering by sub_discipline
-def get_user_tasks_with_filters(user_id, search_term="", discipline_filter=None, sub_discipline_filter=None):
-    """Get tasks with advanced filtering - INCLUDES sub_discipline filtering"""
-    try:
-        with SessionLocal() as session:
-            query = session.query(UserBaseTaskDB).filter(UserBaseTaskDB.user_id == user_id)
+def get_user_tasks_with_filters(user_id, search_term="", discipline_filter=None, sub_discipline_filter=None,
+                                columns=None, session=None):
+    """Get tasks with advanced filtering - INCLUDES sub_discipline filtering
+    
+    Pass columns (e.g. [UserBaseTaskDB.id, UserBaseTaskDB.name]) to get lightweight
+    read-only rows (attribute access, like the ORM objects) instead. Pass session to
+    reuse an open session; otherwise column results are served from a short-lived
+    per-user cache. Full ORM objects are never cached - callers modify them in place.
+    """
+    cache_key = None
+    if columns and session is None:
+        cache_key = (user_id, search_term or "", tuple(discipline_filter or ()), tuple(sub_discipline_filter or ()),
+                     tuple(str(column) for column in columns))
+        cached = _task_list_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+    
+    with _read_session(session) as session:
+        try:
+            conditions = [UserBaseTaskDB.user_id == user_id]
             
             if search_term:
-                query = query.filter(UserBaseTaskDB.name.ilike(f"%{search_term}%"))
+                conditions.append(UserBaseTaskDB.name.ilike(f"%{search_term}%"))
             
             if discipline_filter:
-                query = query.filter(UserBaseTaskDB.discipline.in_(discipline_filter))
+                conditions.append(UserBaseTaskDB.discipline.in_(discipline_filter))
             
             if sub_discipline_filter:  # ✅ NEW: Filter by sub_discipline
-                query = query.filter(UserBaseTaskDB.sub_discipline.in_(sub_discipline_filter))
+                conditions.append(UserBaseTaskDB.sub_discipline.in_(sub_discipline_filter))
             
-            return query.order_by(UserBaseTaskDB.discipline, UserBaseTaskDB.sub_discipline, UserBaseTaskDB.name).all()
-    except Exception as e:
-        logger.error(f"❌ Failed to load tasks: {e}")
-        return []
+            ordering = (UserBaseTaskDB.discipline, UserBaseTaskDB.sub_discipline, UserBaseTaskDB.name)
+            
+            if columns:
+                # Projection: no JSON columns over the wire, no ORM hydration
+                stmt = sa.select(*columns).where(*conditions).order_by(*ordering)
+                rows = session.execute(stmt).all()
+                if cache_key is not None:
+                    _task_list_cache.put(cache_key, tuple(rows))  # Rows are immutable
+                return rows
+            
+            return session.query(UserBaseTaskDB).options(
+                selectinload(UserBaseTaskDB.creator)
+            ).filter(*conditions).order_by(*ordering).all()
+        except SQLAlchemyError as e:
+            logger.error(f"❌ Failed to load tasks: {e}")
+            return []
 
 # ✅ NEW: Migration function for sub_discipline column
 
@@ -286,15 +424,18 @@ def delete_task(task_id: int, user_id: int) -> bool:
     """
     try:
         with SessionLocal() as session:
-            task = session.query(UserBaseTaskDB).filter(
-                UserBaseTaskDB.id == task_id,
-                UserBaseTaskDB.user_id == user_id
-            ).first()
+            # Single DELETE - the WHERE clause enforces ownership, no SELECT needed
+            result = session.execute(
+                sa.delete(UserBaseTaskDB).where(
+                    UserBaseTaskDB.id == task_id,
+                    UserBaseTaskDB.user_id == user_id
+                )
+            )
+            session.commit()
+            invalidate_task_cache(user_id)
             
-            if task:
-                session.delete(task)
-                session.commit()
-                logger.info(f"✅ Task deleted: {task.name} (ID: {task_id})")
+            if result.rowcount > 0:
+                logger.info(f"✅ Task deleted (ID: {task_id})")
                 return True
             else:
                 logger.warning(f"⚠️ Task not found or access denied: ID {task_id} for user {user_id}")
@@ -305,55 +446,78 @@ def delete_task(task_id: int, user_id: int) -> bool:
         session.rollback()
         return False
 
-def get_task_by_id(task_id: int, user_id: int):
-    """Get a specific task by ID for a user"""
-    try:
-        with SessionLocal() as session:
+def get_task_by_id(task_id: int, user_id: int, session=None):
+    """Get a specific task by ID for a user (attached to `session` if one is passed)"""
+    with _read_session(session) as session:
+        try:
             return session.query(UserBaseTaskDB).filter(
                 UserBaseTaskDB.id == task_id,
                 UserBaseTaskDB.user_id == user_id
             ).first()
-    except Exception as e:
-        logger.error(f"Error getting task {task_id}: {e}")
-        return None
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting task {task_id}: {e}")
+            return None
 
-def get_user_tasks(user_id: int):
-    """Get all tasks for a specific user"""
-    try:
-        with SessionLocal() as session:
-            return session.query(UserBaseTaskDB).filter(
+def get_user_tasks(user_id: int, columns=None, session=None):
+    """Get all tasks for a specific user (read-only rows of just `columns` if given)"""
+    with _read_session(session) as session:
+        try:
+            if columns:
+                stmt = sa.select(*columns).where(
+                    UserBaseTaskDB.user_id == user_id
+                ).order_by(UserBaseTaskDB.discipline, UserBaseTaskDB.name)
+                return session.execute(stmt).all()
+            return session.query(UserBaseTaskDB).options(
+                selectinload(UserBaseTaskDB.creator)
+            ).filter(
                 UserBaseTaskDB.user_id == user_id
             ).order_by(UserBaseTaskDB.discipline, UserBaseTaskDB.name).all()
-    except Exception as e:
-        logger.error(f"Error getting tasks for user {user_id}: {e}")
-        return []
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting tasks for user {user_id}: {e}")
+            return []
 
 def get_user_task_count(user_id: int) -> int:
     """Get total number of tasks for a user"""
     try:
         with SessionLocal() as session:
-            return session.query(UserBaseTaskDB).filter(
-                UserBaseTaskDB.user_id == user_id,
-                UserBaseTaskDB.included == True
-            ).count()
+            # Plain SELECT count(*) - Query.count() wraps the query in a subquery
+            return session.execute(
+                sa.select(sa.func.count()).select_from(UserBaseTaskDB).where(
+                    UserBaseTaskDB.user_id == user_id,
+                    UserBaseTaskDB.included == True
+                )
+            ).scalar()
     except Exception as e:
         logger.error(f"Error getting task count for user {user_id}: {e}")
         return 0
 
-def get_task_statistics(user_id: int) -> dict:
-    """Get statistics about user's tasks"""
+def user_has_tasks(user_id: int) -> bool:
+    """Whether the user has any included task - EXISTS stops at the first row"""
     try:
         with SessionLocal() as session:
-            total_tasks = session.query(UserBaseTaskDB).filter(
+            return row_exists(
+                session, UserBaseTaskDB,
                 UserBaseTaskDB.user_id == user_id,
                 UserBaseTaskDB.included == True
-            ).count()
-            
-            tasks_with_duration = session.query(UserBaseTaskDB).filter(
-                UserBaseTaskDB.user_id == user_id,
-                UserBaseTaskDB.included == True,
-                UserBaseTaskDB.base_duration.isnot(None)
-            ).count()
+            )
+    except Exception as e:
+        logger.error(f"Error checking tasks for user {user_id}: {e}")
+        return False
+
+def get_task_statistics(user_id: int) -> dict:
+    """Get statistics about user's tasks"""
+    try:
+        with SessionLocal() as session:
+            # count(base_duration) skips NULLs, so both totals come from one scan
+            total_tasks, tasks_with_duration = session.execute(
+                sa.select(
+                    sa.func.count(),
+                    sa.func.count(UserBaseTaskDB.base_duration)
+                ).select_from(UserBaseTaskDB).where(
+                    UserBaseTaskDB.user_id == user_id,
+                    UserBaseTaskDB.included == True
+                )
+            ).one()
             
             tasks_by_discipline = session.query(
                 UserBaseTaskDB.discipline,
@@ -378,66 +542,27 @@ def get_task_statistics(user_id: int) -> dict:
         return {}
 
 # ===== TASK MANAGEMENT FUNCTIONS =====
-def get_task_by_id(task_id: int, user_id: int):
-    """Get a specific task by ID for a user"""
-    try:
-        with SessionLocal() as session:
-            return session.query(UserBaseTaskDB).filter(
-                UserBaseTaskDB.id == task_id,
-                UserBaseTaskDB.user_id == user_id
-            ).first()
-    except Exception as e:
-        logger.error(f"Error getting task {task_id}: {e}")
-        return None
-
-def get_user_tasks(user_id: int):
-    """Get all tasks for a specific user"""
-    try:
-        with SessionLocal() as session:
-            return session.query(UserBaseTaskDB).filter(
-                UserBaseTaskDB.user_id == user_id
-            ).order_by(UserBaseTaskDB.discipline, UserBaseTaskDB.name).all()
-    except Exception as e:
-        logger.error(f"Error getting tasks for user {user_id}: {e}")
-        return []
-
-def delete_task(task_id: int, user_id: int) -> bool:
-    """Delete a task by ID, ensuring it belongs to the user"""
-    try:
-        with SessionLocal() as session:
-            task = session.query(UserBaseTaskDB).filter(
-                UserBaseTaskDB.id == task_id,
-                UserBaseTaskDB.user_id == user_id
-            ).first()
-            
-            if task:
-                session.delete(task)
-                session.commit()
-                logger.info(f"Task deleted: {task.name} (ID: {task_id})")
-                return True
-            else:
-                logger.warning(f"Task not found or access denied: ID {task_id} for user {user_id}")
-                return False
-                
-    except Exception as e:
-        logger.error(f"Failed to delete task {task_id}: {e}")
-        session.rollback()
-        return False
-
 def toggle_task_inclusion(task_id: int, user_id: int) -> bool:
     """Toggle a task's included status"""
     try:
         with SessionLocal() as session:
-            task = session.query(UserBaseTaskDB).filter(
-                UserBaseTaskDB.id == task_id,
-                UserBaseTaskDB.user_id == user_id
-            ).first()
+            # Atomic server-side flip; RETURNING reports the state it landed in
+            included = session.execute(
+                sa.update(UserBaseTaskDB).where(
+                    UserBaseTaskDB.id == task_id,
+                    UserBaseTaskDB.user_id == user_id
+                ).values(
+                    included=~UserBaseTaskDB.included
+                ).returning(
+                    UserBaseTaskDB.included
+                ).execution_options(synchronize_session=False)
+            ).scalar_one_or_none()
+            session.commit()
+            invalidate_task_cache(user_id)
             
-            if task:
-                task.included = not task.included
-                session.commit()
-                status = "included" if task.included else "excluded"
-                logger.info(f"Task {status}: {task.name} (ID: {task_id})")
+            if included is not None:
+                status = "included" if included else "excluded"
+                logger.info(f"Task {status} (ID: {task_id})")
                 return True
             return False
     except Exception as e:
@@ -454,11 +579,21 @@ def get_user_by_username(username: str):
     except Exception as e:
         logger.error(f"Error getting user {username}: {e}")
         return None
-def migrate_remove_restrictive_constraints():
+def _limit_ddl_wait(conn, timeout):
+    """Make statements in conn's current transaction fail after `timeout` seconds instead of
+    queueing indefinitely behind other sessions' locks (PostgreSQL only)"""
+    if timeout is None or conn.dialect.name != "postgresql":
+        return
+    timeout_ms = int(timeout * 1000)
+    conn.execute(sa.text(f"SET LOCAL lock_timeout = {timeout_ms}"))
+    conn.execute(sa.text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+
+def migrate_remove_restrictive_constraints(timeout=None):
     """Fix the task_type constraint to include 'supervision'"""
     try:
         with SessionLocal() as session:
             with session.bind.connect() as conn:
+                _limit_ddl_wait(conn, timeout)
                 # Drop the old constraint
                 conn.execute(sa.text("""
                     ALTER TABLE user_base_tasks 
@@ -479,17 +614,58 @@ def migrate_remove_restrictive_constraints():
         logger.error(f"❌ Failed to update task_type constraint: {e}")
         return False
     
-def check_and_migrate_database():
-    """Check if database needs migration"""
+def migrate_timestamp_server_defaults(timeout=None):
+    """Give existing created_at/updated_at columns a server-side UTC now() default"""
     try:
         with SessionLocal() as session:
-            # Fix the constraint first
-            if not migrate_remove_restrictive_constraints():
-                return False
+            with session.bind.connect() as conn:
+                _limit_ddl_wait(conn, timeout)
+                utc_now = UtcNow().compile(dialect=conn.dialect)
+                for table in ("users", "user_base_tasks", "schedules", "monitoring"):
+                    for column in ("created_at", "updated_at"):
+                        conn.execute(sa.text(f"""
+                            ALTER TABLE {table} 
+                            ALTER COLUMN {column} SET DEFAULT {utc_now}
+                        """))
                 
-            # Rest of your migration logic...
-            session.execute(sa.text("SELECT 1"))
+                conn.commit()
+            logger.info("✅ Timestamp columns now default to UTC now() server-side")
             return True
     except Exception as e:
-        logger.error(f"❌ Database check failed: {e}")
+        logger.error(f"❌ Failed to set timestamp server defaults: {e}")
         return False
+
+# Schema is immutable at runtime - once migrated, later checks short-circuit
+_SCHEMA_OK = False
+_schema_lock = threading.Lock()
+
+def check_and_migrate_database(force: bool = False, timeout=None):
+    """Check if database needs migration (runs once per process unless forced)
+    
+    With timeout (seconds), each migration statement is cancelled server-side once it has
+    waited that long, and the check reports failure instead of blocking.
+    """
+    global _SCHEMA_OK
+    if _SCHEMA_OK and not force:
+        return True
+    
+    with _schema_lock:
+        if _SCHEMA_OK and not force:
+            return True
+        try:
+            with SessionLocal() as session:
+                # Fix the constraint first
+                if not migrate_remove_restrictive_constraints(timeout):
+                    return False
+                
+                # Timestamps are filled server-side; older tables lack the default
+                if not migrate_timestamp_server_defaults(timeout):
+                    return False
+                    
+                # Rest of your migration logic...
+                session.execute(sa.text("SELECT 1"))
+                _SCHEMA_OK = True
+                return True
+        except Exception as e:
+            logger.error(f"❌ Database check failed: {e}")
+            return False
@@ -1,14 +1,34 @@
 from sqlalchemy import (
     Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text, JSON,
-    CheckConstraint, Index, UniqueConstraint
+    CheckConstraint, Index, UniqueConstraint, text
 )
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.sql.expression import FunctionElement
 from datetime import datetime
+from functools import lru_cache
 
 Base=declarative_base()
+# Binary JSONB on PostgreSQL (indexable, no re-parse on read); plain JSON elsewhere (SQLite fallback/tests)
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
+
+class UtcNow(FunctionElement):
+    """Current UTC time as a naive timestamp, evaluated by the database server"""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(UtcNow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    # now() is in the session time zone; the TIMESTAMP columns hold UTC like datetime.utcnow did
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+@compiles(UtcNow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"  # Already UTC on SQLite
 # Constants for validation
-VALID_ROLES = ['admin', 'manager', 'worker', 'viewer']
-VALID_TASK_TYPES = ['worker', 'equipment', 'hybrid','supervision']
+VALID_ROLES = ('admin', 'manager', 'worker', 'viewer')
+VALID_TASK_TYPES = ('worker', 'equipment', 'hybrid','supervision')
 VALID_DISCIPLINES = {
     'Préliminaires': ['InstallationChantier', 'PréparationTerrain'],
     'Terrassement': ['Décapage', 'Excavation', 'Soutènement Temporaire','Soutènement Permanant'],
@@ -18,14 +38,19 @@ VALID_DISCIPLINES = {
     'Lots techniques': ['CFO','CFA' , 'Ventillation', 'climatisation','Plomberie'],
     'AménagementsExtérieurs': ['VRD', 'EspacesVerts']
 }
-VALID_RESOURCE_TYPES = [
+VALID_RESOURCE_TYPES = (
     'BétonArmé', 'Ferrailleur', 'Plaquiste', 'Maçon', 
     'Étanchéiste', 'Staffeur', 'Peintre', 'Topographe', 'Charpentier', 
     'Soudeur', 'Agent de netoyage', 'Ascensoriste', 'Grutier', 'ConducteurEngins',
      'OpérateurMalaxeur', 'OpérateurJetGrouting','Carreleur-Marbrier'
-]
+)
+
+VALID_SCHEDULE_STATUS = ('scheduled', 'in_progress', 'completed', 'delayed')
 
-VALID_SCHEDULE_STATUS = ['scheduled', 'in_progress', 'completed', 'delayed']
+# SQL IN-list fragments for the enum CHECK constraints, built once at import
+_ROLES_SQL = "(" + ", ".join(repr(r) for r in VALID_ROLES) + ")"
+_TASK_TYPES_SQL = "(" + ", ".join(repr(t) for t in VALID_TASK_TYPES) + ")"
+_SCHEDULE_STATUS_SQL = "(" + ", ".join(repr(s) for s in VALID_SCHEDULE_STATUS) + ")"
 class LoginAttemptDB(Base):
     __tablename__ = "login_attempts"
     id = Column(Integer, primary_key=True)
@@ -48,13 +73,14 @@ class UserDB(Base):
     full_name = Column(String(100), nullable=True)
     role = Column(String(20), default="worker", nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=UtcNow())
+    updated_at = Column(DateTime, server_default=UtcNow(), onupdate=UtcNow())
 
     # Table constraints
     __table_args__ = (
-        CheckConstraint(f"role IN ({', '.join(repr(r) for r in VALID_ROLES)})", name="valid_user_role"),
-        CheckConstraint("char_length(username) >= 3", name="username_min_length"),
+        CheckConstraint(f"role IN {_ROLES_SQL}", name="valid_user_role"),
+        CheckConstraint("length(username) >= 3", name="username_min_length"),
+        {"sqlite_autoincrement": False},  # Plain rowid PK - no sqlite_sequence write per insert
     )
 
     # FIXED: Relationships - UserBaseTaskDB is now the main task model 
@@ -69,8 +95,9 @@ class UserDB(Base):
 
 
 # Add this helper function for discipline validation
+@lru_cache(maxsize=1)
 def get_all_disciplines_flat():
-    """Return a flat list of all valid disciplines for database constraints"""
+    """Return a frozenset of all valid disciplines (built once, cached)"""
     flat_list = []
     for discipline, subdisciplines in VALID_DISCIPLINES.items():
         flat_list.append(discipline)
@@ -80,7 +107,7 @@ def get_all_disciplines_flat():
             for main_sub, subs in subdisciplines.items():
                 flat_list.append(main_sub)
                 flat_list.extend(subs)
-    return list(set(flat_list))
+    return frozenset(flat_list)
 
 VALID_DISCIPLINES_FLAT = get_all_disciplines_flat()
 
@@ -97,14 +124,14 @@ class UserBaseTaskDB(Base):
     task_type = Column(String(20), default="worker")
     base_duration = Column(Float, nullable=True)
     min_crews_needed = Column(Integer, default=1)
-    min_equipment_needed = Column(JSON, default=lambda: {})
-    predecessors = Column(JSON, default=lambda: [])
+    min_equipment_needed = Column(JSONVariant, default=lambda: {})
+    predecessors = Column(JSONVariant, default=lambda: [])
     repeat_on_floor = Column(Boolean, default=True)
     included = Column(Boolean, default=True)
     delay = Column(Integer, default=0)
     
     # Cross-floor configuration
-    cross_floor_dependencies = Column(JSON, default=lambda: [])
+    cross_floor_dependencies = Column(JSONVariant, default=lambda: [])
     applies_to_floors = Column(String(20), default="auto")
     
     # System constraints
@@ -114,14 +141,14 @@ class UserBaseTaskDB(Base):
     # User tracking
     created_by_user = Column(Boolean, default=True)
     creator_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=UtcNow())
+    updated_at = Column(DateTime, server_default=UtcNow(), onupdate=UtcNow())
     
     creator = relationship("UserDB", foreign_keys=[creator_id])
     
     # ✅ UPDATED: Add sub_discipline to constraints and indexes
     __table_args__ = (
-        CheckConstraint(f"task_type IN ({', '.join(repr(r) for r in VALID_TASK_TYPES)})", name="valid_task_type"),
+        CheckConstraint(f"task_type IN {_TASK_TYPES_SQL}", name="valid_task_type"),
         CheckConstraint("min_crews_needed >= 0", name="non_negative_crews"),
         CheckConstraint("delay >= 0", name="non_negative_delay"),
         Index('idx_task_discipline_included', 'discipline', 'included'),
@@ -129,7 +156,13 @@ class UserBaseTaskDB(Base):
         Index('idx_task_creator', 'creator_id', 'created_at'),
         Index('idx_task_resource_type', 'resource_type', 'included'),
         Index('idx_user_tasks_user', 'user_id', 'included'),
+        # Matches the task-list ORDER BY under a user_id filter, so rows come back pre-sorted
+        Index('idx_user_tasks_ordered', 'user_id', 'discipline', 'sub_discipline', 'name'),
+        # GIN indexes serve containment lookups such as predecessors @> '["3.1"]' (PostgreSQL only)
+        Index('idx_task_predecessors_gin', 'predecessors', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('idx_task_cross_floor_deps_gin', 'cross_floor_dependencies', postgresql_using='gin').ddl_if(dialect='postgresql'),
         UniqueConstraint('user_id', 'name', 'discipline', 'sub_discipline', name='unique_user_task_per_discipline_sub'),
+        {"sqlite_autoincrement": False},
         )
 class DisciplineZoneConfigDB(Base):
     __tablename__ = "discipline_zone_config"
@@ -138,7 +171,7 @@ class DisciplineZoneConfigDB(Base):
     project_id = Column(String(50), nullable=False, index=True)
     discipline = Column(String(50), nullable=False)
     strategy = Column(String(50), default="group_sequential")
-    zone_groups = Column(JSON, nullable=False, default=lambda: [])
+    zone_groups = Column(JSONVariant, nullable=False, default=lambda: [])
 
     def __repr__(self):
         return f"<DisciplineZoneConfig project={self.project_id} discipline={self.discipline}>"
@@ -149,7 +182,7 @@ class ScheduleDB(Base):
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    project_id = Column(String(50), nullable=False, index=True)
+    project_id = Column(String(50), nullable=False)  # Served by leading column of idx_schedule_project
     project_name = Column(String(200), nullable=False)
     zone = Column(String(50), nullable=False)
     floor = Column(Integer, nullable=False)
@@ -162,24 +195,32 @@ class ScheduleDB(Base):
     progress = Column(Float, default=0.0)
     status = Column(String(20), default="scheduled")
     allocated_crews = Column(Integer)
-    allocated_equipment = Column(JSON)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    allocated_equipment = Column(JSONVariant)
+    created_at = Column(DateTime, server_default=UtcNow())
+    updated_at = Column(DateTime, server_default=UtcNow(), onupdate=UtcNow())
 
     # Table constraints and indexes
     __table_args__ = (
         CheckConstraint("end_date > start_date", name="valid_date_range"),
         CheckConstraint("progress >= 0 AND progress <= 100", name="valid_progress"),
         CheckConstraint("floor >= 0", name="non_negative_floor"),
-        CheckConstraint(f"status IN ({', '.join(repr(s) for s in VALID_SCHEDULE_STATUS)})", name="valid_schedule_status"),
+        CheckConstraint(f"status IN {_SCHEDULE_STATUS_SQL}", name="valid_schedule_status"),
         Index('idx_schedule_project', 'project_id', 'zone', 'floor'),
         Index('idx_schedule_dates', 'start_date', 'end_date'),
         Index('idx_schedule_status', 'status', 'progress'),
+        # Partial index over live work only - completed rows dominate over time and stay out of it
+        Index(
+            'idx_schedule_active', 'status', 'end_date',
+            postgresql_where=text("status IN ('scheduled', 'in_progress', 'delayed')"),
+            sqlite_where=text("status != 'completed'"),
+        ),
+        {"sqlite_autoincrement": False},
     )
 
-    # FIXED: Relationships
-    user = relationship("UserDB", back_populates="schedules")
-    task = relationship("UserBaseTaskDB")  # ✅ FIXED: Reference UserBaseTaskDB
+    # FIXED: Relationships - lazy="raise" turns accidental N+1 access into an error;
+    # list queries must opt in with selectinload(ScheduleDB.task) / selectinload(ScheduleDB.user)
+    user = relationship("UserDB", back_populates="schedules", lazy="raise")
+    task = relationship("UserBaseTaskDB", lazy="raise")  # ✅ FIXED: Reference UserBaseTaskDB
 
     def __repr__(self):
         return f"<Schedule {self.task_name} - {self.project_name}>"
@@ -189,18 +230,19 @@ class MonitoringDB(Base):
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    project_id = Column(String(50), nullable=False, index=True)
+    project_id = Column(String(50), nullable=False)  # Served by leading column of idx_monitoring_project
     reference_file_path = Column(String(500), nullable=False)
     actual_file_path = Column(String(500), nullable=False)
     analysis_csv_path = Column(String(500), nullable=True)
     monitoring_date = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=UtcNow())
+    updated_at = Column(DateTime, server_default=UtcNow(), onupdate=UtcNow())
 
     # Table indexes
     __table_args__ = (
         Index('idx_monitoring_project', 'project_id', 'monitoring_date'),
         Index('idx_monitoring_user', 'user_id', 'created_at'),
+        {"sqlite_autoincrement": False},
     )
 
     # relationships
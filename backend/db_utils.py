@@ -1,32 +1,34 @@
-from sqlalchemy.orm import Session
-from backend.db_models import User, UserBaseTaskDB, ScheduleDB, MonitoringDB
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import select
+from backend.db_models import UserDB, UserBaseTaskDB, ScheduleDB, MonitoringDB
 from typing import List, Optional
 
 # ---------------- User CRUD ----------------
-def create_user(db: Session, user: User) -> User:
+def create_user(db: Session, user: UserDB) -> UserDB:
     db.add(user)
     db.commit()
     db.refresh(user)
     return user
 
-def get_user(db: Session, user_id: int) -> Optional[User]:
-    return db.query(User).filter(User.id == user_id).first()
+def get_user(db: Session, user_id: int) -> Optional[UserDB]:
+    # Identity-map lookup first; only hits the database on a miss
+    return db.get(UserDB, user_id)
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email).first()
+def get_user_by_email(db: Session, email: str) -> Optional[UserDB]:
+    return db.execute(select(UserDB).where(UserDB.email == email)).scalars().first()
 
-def list_users(db: Session) -> List[User]:
-    return db.query(User).all()
+def list_users(db: Session) -> List[UserDB]:
+    return db.query(UserDB).all()
 
 
 # ---------------- Task CRUD ----------------
-def get_base_task(db: Session, task_id: int) -> Optional[BaseTaskDB]:
-    return db.query(BaseTaskDB).filter(BaseTaskDB.id == task_id).first()
+def get_base_task(db: Session, task_id: int) -> Optional[UserBaseTaskDB]:
+    return db.get(UserBaseTaskDB, task_id)
 
-def list_base_tasks(db: Session, discipline: Optional[str] = None) -> List[BaseTaskDB]:
-    query = db.query(BaseTaskDB)
+def list_base_tasks(db: Session, discipline: Optional[str] = None) -> List[UserBaseTaskDB]:
+    query = db.query(UserBaseTaskDB)
     if discipline:
-        query = query.filter(BaseTaskDB.discipline == discipline)
+        query = query.filter(UserBaseTaskDB.discipline == discipline)
     return query.all()
 
 
@@ -38,7 +40,10 @@ def create_schedule(db: Session, schedule: ScheduleDB) -> ScheduleDB:
     return schedule
 
 def list_schedules(db: Session, user_id: Optional[int] = None) -> List[ScheduleDB]:
-    query = db.query(ScheduleDB)
+    query = db.query(ScheduleDB).options(
+        selectinload(ScheduleDB.task),
+        selectinload(ScheduleDB.user)
+    )
     if user_id:
         query = query.filter(ScheduleDB.user_id == user_id)
     return query.all()
@@ -1,53 +1,144 @@
 
 
 
+import atexit
 import os
 import logging
+import queue
+import random
+import re
 import sys
+import threading
 import time
-from typing import Dict, List, Any, Optional
-from sqlalchemy import text, inspect
-from sqlalchemy.orm import sessionmaker
+from logging.handlers import QueueHandler, QueueListener
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterator, List, Any, Mapping, Optional
+from sqlalchemy import inspect, select, func
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.exc import SQLAlchemyError
 
 # Core backend imports
-from backend.database import engine, SessionLocal, check_database_health
+from backend.database import engine, SessionLocal, check_database_health, insert_ignore_conflicts, row_exists
+from backend.database import config as db_config
 from backend.db_models import Base, UserDB, UserBaseTaskDB
-from backend.auth import hash_password
-from backend.database_operations import create_default_tasks_from_defaults_py, check_and_migrate_database
+from backend.database_operations import copy_default_tasks_to_user, check_and_migrate_database
+from config.settings import settings
 
 # ---------------------------------------------------------------------
 # Logging Configuration
 # ---------------------------------------------------------------------
-LOG_DIR = os.path.join(os.getcwd(), "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[
-        logging.FileHandler(os.path.join(LOG_DIR, "backend.log"), encoding="utf-8"),
-        logging.StreamHandler(sys.stdout),
-    ],
+# Same directory the rest of the app logs to (LOG_DIR env var, default "logs")
+LOG_DIR = settings.LOG_DIR
+
+
+class _LazyFileHandler(logging.FileHandler):
+    """FileHandler that creates LOG_DIR and opens the file on the first record, not at import"""
+
+    def __init__(self, filename, encoding=None):
+        super().__init__(filename, encoding=encoding, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class _PlainFormatter(logging.Formatter):
+    """Formatter that drops the status emoji (✅, ❌, 🚀, ...) from log lines"""
+
+    _EMOJI = re.compile("[\U0001F300-\U0001FAFF\u2139\u2600-\u27BF\uFE0F]+ ?")
+
+    def format(self, record):
+        return self._EMOJI.sub("", super().format(record))
+
+
+# Production logs stay plain so aggregators and non-UTF-8 consoles get clean lines
+PLAIN_LOG_FORMAT = db_config.env == "production"
+
+# Layout shared by the file and stdout handlers
+_log_formatter = (_PlainFormatter if PLAIN_LOG_FORMAT else logging.Formatter)(
+    "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 )
+
+# Handlers are installed by init_backend(), not at import, so short-lived tools that only
+# import this module (health checks, task listings) start no listener thread
+log_listener = None
+_QUEUE_HANDLER_NAME = "backend.log-queue"
+
+
+def _configure_logging() -> None:
+    """Route root logging through a queue to backend.log and stdout, once per process.
+
+    Only our own queue handler counts as already configured: a basicConfig() elsewhere
+    (scheduling_engin calls one at import) must not switch backend file logging off, and
+    re-imports (test runs, module reloads) must not stack handlers or start a second listener.
+    """
+    global log_listener
+    root = logging.getLogger()
+    if any(handler.get_name() == _QUEUE_HANDLER_NAME for handler in root.handlers):
+        return
+
+    handlers = [_LazyFileHandler(os.path.join(LOG_DIR, "backend.log"), encoding="utf-8")]
+    # A console handler from an earlier basicConfig() already echoes every record
+    if not any(type(handler) is logging.StreamHandler for handler in root.handlers):
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(_log_formatter)
+
+    # Records go onto an in-memory queue; a background listener thread does the file/stdout I/O
+    log_queue = queue.Queue(-1)
+    log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)  # Flush queued records on shutdown
+
+    # QueueHandler.prepare() bakes its own format into record.msg; keep it to the bare message
+    # so the listener's handlers apply the real layout exactly once
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    queue_handler.set_name(_QUEUE_HANDLER_NAME)
+
+    root.addHandler(queue_handler)
+    if root.getEffectiveLevel() > logging.INFO:
+        root.setLevel(logging.INFO)
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------
 # Default Data
 # ---------------------------------------------------------------------
+# Password hashes are precomputed (werkzeug pbkdf2:sha256, as produced by backend.auth.hash_password)
+# so seeding does no KDF work. Dev logins: admin/admin123, abdo/1234, manager/manager123,
+# worker/worker123, viewer/viewer123.
 DEFAULT_USERS = [
-    {"username": "admin", "email": "admin@construction.com", "password": "admin123", "full_name": "System Administrator", "role": "admin"},
-    {"username": "abdo", "email": "daoudiabdellah1999@gmail.com", "password": "1234", "full_name": "System Administrator", "role": "admin"},
-    {"username": "manager", "email": "manager@construction.com", "password": "manager123", "full_name": "Project Manager", "role": "manager"},
-    {"username": "worker", "email": "worker@construction.com", "password": "worker123", "full_name": "Construction Worker", "role": "worker"},
-    {"username": "viewer", "email": "viewer@construction.com", "password": "viewer123", "full_name": "Project Viewer", "role": "viewer"},
+    {"username": "admin", "email": "admin@construction.com", "hashed_password": "pbkdf2:sha256:600000$z7AfOy7F1B2H8IuX$3a06e2817dd5f84c96d8fda678e9fa8f3ea546e352a1bff7aa9f6254f71c88ab", "full_name": "System Administrator", "role": "admin"},
+    {"username": "abdo", "email": "daoudiabdellah1999@gmail.com", "hashed_password": "pbkdf2:sha256:600000$uhoLuin9lI3CpK8b$2acd65057e49504685b574eeca00b125947d2f7255aacdd99ad73f6bd9cea5a7", "full_name": "System Administrator", "role": "admin"},
+    {"username": "manager", "email": "manager@construction.com", "hashed_password": "pbkdf2:sha256:600000$PHeF29VHQTyzuG9M$57a48de5cadcb9c2775083ac1bfd4e5b57a3586df013625fb48301a182996b32", "full_name": "Project Manager", "role": "manager"},
+    {"username": "worker", "email": "worker@construction.com", "hashed_password": "pbkdf2:sha256:600000$jCjbxHcdVO0m8LRG$22e108e8a26ae6fabcd13f65394839a177baef2a86a959efcb245502ef39c895", "full_name": "Construction Worker", "role": "worker"},
+    {"username": "viewer", "email": "viewer@construction.com", "hashed_password": "pbkdf2:sha256:600000$A4Qbvr57pPlbfa5z$4bf20a28178753ade93038d325f5af670b819bff7141537fcc8d1f47ba9bd5c0", "full_name": "Project Viewer", "role": "viewer"},
 ]
 
-ROLE_PERMISSIONS = {
-    "admin": ["read", "write", "manage_users", "manage_tasks", "monitor", "export", "system_config"],
-    "manager": ["read", "write", "manage_tasks", "monitor", "export"],
-    "worker": ["read", "write", "monitor"],
-    "viewer": ["read", "monitor"],
+# Scheduling defaults are imported once; the getters below hand out these references
+try:
+    from defaults import workers, equipment, cross_floor_links, acceleration, SHIFT_CONFIG, BASE_TASKS
+    BASE_TASKS_COUNT = sum(len(tasks) for tasks in BASE_TASKS.values())
+except ImportError as e:
+    logger.warning("Defaults module unavailable: %s", e)
+    workers, equipment = {}, {}
+    cross_floor_links, acceleration, SHIFT_CONFIG = {}, {}, {}
+    BASE_TASKS_COUNT = 0
+
+ROLE_PERMISSIONS: Mapping[str, FrozenSet[str]] = {
+    "admin": frozenset({"read", "write", "manage_users", "manage_tasks", "monitor", "export", "system_config"}),
+    "manager": frozenset({"read", "write", "manage_tasks", "monitor", "export"}),
+    "worker": frozenset({"read", "write", "monitor"}),
+    "viewer": frozenset({"read", "monitor"}),
 }
+_NO_PERMISSIONS: FrozenSet[str] = frozenset()
+
+
+def has_permission(role: str, permission: str) -> bool:
+    """O(1) permission check; unknown roles have no permissions"""
+    return permission in ROLE_PERMISSIONS.get(role, _NO_PERMISSIONS)
 
 
 # ---------------------------------------------------------------------
@@ -59,6 +150,10 @@ class BackendInitializer:
         self.health_status: Dict[str, Any] = {}
         self.initialization_time = None
         self.version = "2.1.0"
+        self.health_ttl = 5.0
+        self._health_checked_at = 0.0
+        self._health_lock = threading.Lock()
+        self._known_tables: Optional[frozenset] = None  # Table names seen after the last successful _create_tables
 
     # -----------------------------------------------------------------
     def initialize(self, force: bool = False) -> bool:
@@ -68,6 +163,7 @@ class BackendInitializer:
 
         logger.info(f"🚀 Starting backend initialization v{self.version}...")
         start_time = time.time()
+        self._health_checked_at = 0.0  # Invalidate cached health on (re)initialization
 
         try:
             # Step 1: Check DB
@@ -78,12 +174,14 @@ class BackendInitializer:
             if not self._safe_migrate_database(timeout=10):
                 return False
 
-            # Step 3: Create tables (idempotent)
-            if not self._create_tables():
-                return False
-
-            # Step 4: Default users & tasks
-            if not self._initialize_defaults():
+            # Steps 3 + 4: Tables and default users/tasks share one transaction - a single
+            # commit on first boot, and a failed seed leaves no half-initialized schema
+            try:
+                with engine.begin() as conn:
+                    self._create_tables(conn)
+                    self._initialize_defaults(conn)
+            except SQLAlchemyError:
+                self._known_tables = None  # The DDL may have been rolled back with the seed
                 return False
 
             # Step 5: Final health check
@@ -101,8 +199,9 @@ class BackendInitializer:
 
     # -----------------------------------------------------------------
     def _check_database_connection(self) -> bool:
-        """Verify DB connectivity with retries"""
-        for attempt in range(3):
+        """Verify DB connectivity with retries (exponential backoff + jitter between failures)"""
+        max_attempts = 5
+        for attempt in range(max_attempts):
             try:
                 health = check_database_health()
                 if health.get("status") == "healthy":
@@ -110,90 +209,132 @@ class BackendInitializer:
                     return True
             except Exception as e:
                 logger.warning(f"DB connection attempt {attempt + 1} failed: {e}")
-            time.sleep(2)
-        logger.error("❌ Could not connect to database after 3 retries.")
+            if attempt < max_attempts - 1:
+                # 0.1s, 0.3s, 0.9s, 2.7s - a briefly unavailable DB costs tenths of a second, not seconds
+                delay = 0.1 * 3 ** attempt
+                time.sleep(delay + random.random() * delay * 0.2)
+        logger.error(f"❌ Could not connect to database after {max_attempts} retries.")
         return False
 
     # -----------------------------------------------------------------
     def _safe_migrate_database(self, timeout: int = 10) -> bool:
-        """Run migrations safely with timeout watchdog"""
+        """Run migrations once; each DDL statement gives up after `timeout` seconds"""
         logger.info("🔄 Checking for database migrations...")
-        start = time.time()
 
         try:
-            while True:
-                if time.time() - start > timeout:
-                    logger.warning("⚠️ Migration check timed out (skipping).")
-                    return True  # Skip instead of blocking forever
-
-                success = check_and_migrate_database()
-                if success:
-                    logger.info("✅ Database migrations applied successfully.")
-                    return True
-
-                time.sleep(0.5)
+            # Bounded server-side (lock/statement timeouts) rather than by a watchdog thread,
+            # so no migration is still running once seeding starts
+            if check_and_migrate_database(timeout=timeout):
+                logger.info("✅ Database migrations applied successfully.")
+            else:
+                logger.warning("⚠️ Migration check reported failure or timed out (continuing).")
+            return True
         except Exception as e:
             logger.warning(f"⚠️ Migration step failed or unavailable: {e}")
             return True  # Non-blocking fail-safe
 
     # -----------------------------------------------------------------
-    def _create_tables(self) -> bool:
+    def _create_tables(self, conn) -> None:
+        """Create any missing tables on `conn`; raises on failure so the caller's transaction rolls back"""
         try:
-            Base.metadata.create_all(bind=engine)
-            inspector = inspect(engine)
-            tables = inspector.get_table_names()
+            # Tables are never dropped at runtime - a forced re-init can trust the last listing
+            if self._known_tables is not None and self._known_tables.issuperset(Base.metadata.tables):
+                logger.info(f"✅ Tables ready ({len(self._known_tables)} total, cached).")
+                return
+            
+            # One table listing instead of create_all's per-table existence probes
+            existing = set(inspect(conn).get_table_names())
+            missing = [table for name, table in Base.metadata.tables.items() if name not in existing]
+            if missing:
+                Base.metadata.create_all(bind=conn, tables=missing)
+                logger.info(f"✅ Created {len(missing)} missing tables.")
+            self._known_tables = frozenset(existing).union(Base.metadata.tables)
+            tables = Base.metadata.tables
             logger.info(f"✅ Tables ready ({len(tables)} total).")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Failed creating tables: {e}")
-            return False
+        except SQLAlchemyError as e:
+            logger.error("❌ Failed creating tables: %s", e)
+            raise
 
     # -----------------------------------------------------------------
-    def _initialize_defaults(self) -> bool:
+    def _initialize_defaults(self, conn) -> None:
+        """Seed default users and tasks on `conn`; raises on failure so the caller's transaction rolls back"""
         try:
-            with SessionLocal() as session:
-                if session.query(UserDB).count() == 0:
+            # Bound to the caller's connection: session commits don't end the outer transaction
+            with SessionLocal(bind=conn) as session:
+                # Existence probe - no need to count every user
+                if not row_exists(session, UserDB):
                     logger.info("👥 Creating default users...")
-                    for u in DEFAULT_USERS:
-                        user = UserDB(
-                            username=u["username"],
-                            email=u["email"],
-                            hashed_password=hash_password(u["password"]),
-                            full_name=u["full_name"],
-                            role=u["role"],
-                            is_active=True,
-                        )
-                        session.add(user)
-                    session.commit()
+                    # Hashes are baked into DEFAULT_USERS - one executemany INSERT, no KDF work
+                    rows = [
+                        {
+                            "username": u["username"],
+                            "email": u["email"],
+                            "hashed_password": u["hashed_password"],
+                            "full_name": u["full_name"],
+                            "role": u["role"],
+                            "is_active": True,
+                        }
+                        for u in DEFAULT_USERS
+                    ]
+                    # Conflict-tolerant so replicas booting together can't both fail on UniqueViolation
+                    insert_ignore_conflicts(session, UserDB, rows)
                     logger.info("✅ Default users created.")
                 else:
                     logger.info("ℹ️ Default users already exist.")
 
-            # Create default tasks
-            with SessionLocal() as session:
-                admin = session.query(UserDB).filter_by(username="admin").first()
-                if admin:
-                    create_default_tasks_from_defaults_py(admin.id)
+                # Create default tasks - same session, so the uncommitted admin row is visible.
+                # commit=False: a failed copy raises instead of rolling back the outer transaction
+                admin_id = session.query(UserDB.id).filter_by(username="admin").scalar()
+                if admin_id is not None:
+                    copy_default_tasks_to_user(admin_id, session, commit=False)
                     logger.info("✅ Default tasks ensured.")
                 else:
                     logger.warning("⚠️ Admin user not found, skipped task creation.")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Default data initialization failed: {e}")
-            return False
+                session.commit()
+        except SQLAlchemyError as e:
+            logger.error("❌ Default data initialization failed: %s", e)
+            raise
 
     # -----------------------------------------------------------------
-    def _health_check(self) -> Dict[str, Any]:
-        status = {"database": False, "users": 0, "tasks": 0, "healthy": False}
+    def _health_check(self, force: bool = False, verbose: bool = False) -> Dict[str, Any]:
+        """Probe the database; verbose=True adds full user/task counts (table scans)"""
+        # Serialized so concurrent sessions polling at once trigger one probe, not one each
+        with self._health_lock:
+            cached = self.health_status
+            if (not force and cached and time.monotonic() - self._health_checked_at < self.health_ttl
+                    and (not verbose or "user_count" in cached.get("details", {}))):
+                return cached
+            
+            self.health_status = self._probe_health(verbose)
+            self._health_checked_at = time.monotonic()
+            return self.health_status
+
+    def _probe_health(self, verbose: bool) -> Dict[str, Any]:
+        details = {"database": False, "has_users": False, "has_tasks": False, "default_tasks": BASE_TASKS_COUNT}
+        status = {"overall_healthy": False, "details": details}
         try:
             with SessionLocal() as session:
-                session.execute(text("SELECT 1"))
-                status["database"] = True
-                status["users"] = session.query(UserDB).count()
-                status["tasks"] = session.query(UserBaseTaskDB).count()
-                status["healthy"] = status["database"] and status["users"] > 0
+                if verbose:
+                    # Connectivity and both counts in a single round-trip
+                    users, tasks = session.execute(
+                        select(
+                            select(func.count()).select_from(UserDB).scalar_subquery(),
+                            select(func.count()).select_from(UserBaseTaskDB).scalar_subquery(),
+                        )
+                    ).one()
+                    details["user_count"] = users
+                    details["task_count"] = tasks
+                    details["has_users"] = users > 0
+                    details["has_tasks"] = tasks > 0
+                else:
+                    # Both EXISTS probes in one round-trip
+                    details["has_users"], details["has_tasks"] = session.execute(
+                        select(select(UserDB.id).exists(), select(UserBaseTaskDB.id).exists())
+                    ).one()
+                details["database"] = True
+                status["overall_healthy"] = details["has_users"]
         except Exception as e:
-            status["error"] = str(e)
+            details["error"] = str(e)
         return status
 
 
@@ -203,10 +344,19 @@ class BackendInitializer:
 _backend = BackendInitializer()
 
 def init_backend(force: bool = False) -> bool:
+    settings.ensure_dirs()
+    _configure_logging()
     return _backend.initialize(force)
 
-def check_backend_health() -> Dict[str, Any]:
-    return _backend.health_status or {"status": "not_initialized"}
+def check_backend_health(force: bool = False, verbose: bool = False) -> Dict[str, Any]:
+    """Current health, re-probed at most once per health_ttl unless force=True.
+    
+    The default probe is O(1); pass verbose=True for user/task counts.
+    """
+    if not _backend.initialized:
+        return _backend.health_status or {"status": "not_initialized"}
+    _backend.health_status = _backend._health_check(force=force, verbose=verbose)
+    return _backend.health_status
 
 def get_backend_status() -> Dict[str, Any]:
     return {
@@ -216,8 +366,27 @@ def get_backend_status() -> Dict[str, Any]:
         "time": _backend.initialization_time,
     }
 
-def get_db_session():
-    return SessionLocal()
+@lru_cache(maxsize=1)
+def get_default_resources():
+    """(workers, equipment) from defaults.py"""
+    return workers, equipment
+
+@lru_cache(maxsize=1)
+def get_default_scheduling_config() -> Mapping[str, Any]:
+    """Read-only view - every caller shares the same cached instance"""
+    return MappingProxyType({
+        "cross_floor_links": cross_floor_links,
+        "acceleration": acceleration,
+        "shift_config": SHIFT_CONFIG,
+    })
+
+def get_db_session() -> Iterator[Session]:
+    """Yield a session that is always closed afterwards (usable as a DI dependency)"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
 
 # ---------------------------------------------------------------------
 logger.info(f"Backend initialization module v{_backend.version} ready")
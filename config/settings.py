@@ -1,9 +1,9 @@
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./construction.db")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-me")
@@ -16,21 +16,17 @@ class Settings:
     BACKUP_DIR: str = os.getenv("BACKUP_DIR", "backups")
 
     MAX_UPLOAD_SIZE_MB: int = 50
-    ALLOWED_EXTENSIONS: List[str] = None
+    ALLOWED_EXTENSIONS: List[str] = field(default_factory=lambda: [".xlsx", ".xls", ".csv"])
 
-    DEFAULT_WORKWEEK: List[int] = None
+    DEFAULT_WORKWEEK: List[int] = field(default_factory=lambda: [0, 1, 2, 3, 4])
     DEFAULT_SHIFT_HOURS: int = 8
 
     APP_NAME: str = "Construction Project Manager"
     APP_VERSION: str = "2.0.0"
 
-    def __post_init__(self):
-        if self.ALLOWED_EXTENSIONS is None:
-            self.ALLOWED_EXTENSIONS = [".xlsx", ".xls", ".csv"]
-        if self.DEFAULT_WORKWEEK is None:
-            self.DEFAULT_WORKWEEK = [0, 1, 2, 3, 4]
-
-        for directory in [self.LOG_DIR, self.OUTPUT_DIR, self.TEMPLATE_DIR, self.BACKUP_DIR]:
+    def ensure_dirs(self):
+        """Create the log/output/template/backup directories (called on backend init, not import)"""
+        for directory in (self.LOG_DIR, self.OUTPUT_DIR, self.TEMPLATE_DIR, self.BACKUP_DIR):
             os.makedirs(directory, exist_ok=True)
 
 settings = Settings()
\ No newline at end of file
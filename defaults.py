@@ -2,6 +2,8 @@ from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 
+import numpy as np
+
 # Import models - fixed import path
 try:
     from models import WorkerResource, EquipmentResource, BaseTask, Task
@@ -43,71 +45,75 @@ disciplines=['Préliminaires',
 # =======================
 # WORKER RESOURCES
 # =======================
+def _worker(name, count, hourly_rate, productivity_rates, skills, max_crews) -> WorkerResource:
+    """WorkerResource whose max_crews is one limit shared by every task in productivity_rates"""
+    return WorkerResource(
+        name, count=count, hourly_rate=hourly_rate,
+        productivity_rates=productivity_rates,
+        skills=skills,
+        max_crews=dict.fromkeys(productivity_rates, max_crews)
+    )
+
 workers = {
-    "BétonArmé": WorkerResource(
+    "BétonArmé": _worker(
         "BétonArmé", count=200, hourly_rate=18,
         productivity_rates={
             "GO-F-03": 5, "GO-F-05": 5, "GO-S-03": 5, "GO-S-04": 5, "GO-S-06": 5, "GO-S-07": 12, 
             "FDP-07": 5, "FDP-12": 5, "FDP-15": 5
         },
         skills=["BétonArmé"],
-        max_crews={
-            "GO-F-03": 25, "GO-F-05": 25, "GO-S-03": 25, "GO-S-04": 25, "GO-S-06": 25, "GO-S-07": 25, 
-            "FDP-07": 25, "FDP-12": 25, "FDP-15": 25
-        }
+        max_crews=25
     ),
 
-    "Ferrailleur": WorkerResource(
+    "Ferrailleur": _worker(
         "Ferrailleur", count=85, hourly_rate=18,
         productivity_rates={
             "FDP-06": 400, "FDP-11": 180, "GO-F-04": 300, "GO-S-02": 180, "GO-S-05": 300
         },
         skills=["BétonArmé"],
-        max_crews={
-            "FDP-06": 25, "FDP-11": 25, "GO-F-04": 25, "GO-S-02": 25, "GO-S-05": 25
-        }
+        max_crews=25
     ),
 
-    "Topographe": WorkerResource(
+    "Topographe": _worker(
         "Topographe", count=5, hourly_rate=18,
         productivity_rates={"PRE-01": 100, "PRE-03": 100, "TER-01": 100, "FDP-01": 100, "FDP-02": 100, "FDP-05": 100, "FDP-17": 100},
         skills=["Topographie"],
-        max_crews={"PRE-01": 10, "PRE-03": 10, "TER-01": 10, "FDP-01": 10, "FDP-02": 10, "FDP-05": 10, "FDP-17": 10}
+        max_crews=10
     ),
 
-    "Maçon": WorkerResource(
+    "Maçon": _worker(
         "Maçon", count=84, hourly_rate=40,
         productivity_rates={"PRE-02": 10, "SO-01": 10},
         skills=["Maçonnerie"],
-        max_crews={"PRE-02": 25, "SO-01": 25}
+        max_crews=25
     ),
 
-    "Plaquiste": WorkerResource(
+    "Plaquiste": _worker(
         "Plaquiste", count=84, hourly_rate=40,
         productivity_rates={"SO-02": 10, "SO-03": 10},
         skills=["Cloisennement", "Faux-plafond"],
-        max_crews={"SO-02": 25, "SO-03": 25}
+        max_crews=25
     ),
 
-    "Étanchéiste": WorkerResource(
+    "Étanchéiste": _worker(
         "Étanchéiste", count=83, hourly_rate=40,
         productivity_rates={"SO-06": 10, "SO-07": 10},
         skills=["Etanchiété"],
-        max_crews={"SO-06": 25, "SO-07": 25}
+        max_crews=25
     ),
 
-    "Carreleur-Marbrier": WorkerResource(
+    "Carreleur-Marbrier": _worker(
         "Carreleur-Marbrier", count=84, hourly_rate=40,
         productivity_rates={"SO-04": 15, "SO-05": 10},
         skills=["Carrelage", "Marbre", "Revetement"],
-        max_crews={"SO-04": 15, "SO-05": 15}
+        max_crews=15
     ),
 
-    "Peintre": WorkerResource(
+    "Peintre": _worker(
         "Peintre", count=8, hourly_rate=40,
         productivity_rates={"SO-08": 10, "SO-09": 25},
         skills=["Peinture"],
-        max_crews={"SO-08": 15, "SO-09": 15}
+        max_crews=15
     ),
 
     "Charpentier": WorkerResource(
@@ -117,25 +123,25 @@ workers = {
         max_crews={"GO-S-08": 10, "GO-S-09": 8}
     ),
 
-    "Soudeur": WorkerResource(
+    "Soudeur": _worker(
         "Soudeur", count=8, hourly_rate=50,
         productivity_rates={"GO-S-10": 6},
         skills=["Soudure"],
-        max_crews={"GO-S-10": 8}
+        max_crews=8
     ),
 
-    "Ascensoriste": WorkerResource(
+    "Ascensoriste": _worker(
         "Ascensoriste", count=6, hourly_rate=55,
         productivity_rates={"SO-10": 4},
         skills=["Ascenseurs"],
-        max_crews={"SO-10": 6}
+        max_crews=6
     ),
 
-    "Agent de netoyage": WorkerResource(
+    "Agent de netoyage": _worker(
         "Agent de netoyage", count=15, hourly_rate=25,
         productivity_rates={"SO-11": 100},
         skills=["Nettoyage"],
-        max_crews={"SO-11": 10}
+        max_crews=10
     ),
     
     "ConducteurEngins": WorkerResource(
@@ -160,6 +166,38 @@ workers = {
 }
 
 
+# =======================
+# WORKER PRODUCTIVITY MATRICES
+# =======================
+# Struct-of-arrays view of `workers`: row = worker, column = task id, so sweeps over
+# tasks x workers are array operations instead of nested dict lookups. 0 means the
+# worker does not perform the task. Snapshot of the literals above - the dicts stay
+# the source of truth for legacy callers.
+WORKER_NAMES = tuple(workers)
+TASK_IDS = tuple(sorted({tid for w in workers.values() for tid in w.productivity_rates}))
+WORKER_INDEX = {name: i for i, name in enumerate(WORKER_NAMES)}
+TASK_INDEX = {tid: j for j, tid in enumerate(TASK_IDS)}
+
+def _build_worker_matrices():
+    """Fill the (worker x task) productivity and max-crews matrices in one pass"""
+    prod = np.zeros((len(WORKER_NAMES), len(TASK_IDS)), dtype=np.float64)
+    max_crews = np.zeros((len(WORKER_NAMES), len(TASK_IDS)), dtype=np.int32)
+    for name, worker in workers.items():
+        i = WORKER_INDEX[name]
+        for tid, rate in worker.productivity_rates.items():
+            prod[i, TASK_INDEX[tid]] = rate
+        for tid, crews in (worker.max_crews or {}).items():
+            if tid in TASK_INDEX:
+                max_crews[i, TASK_INDEX[tid]] = crews
+    return prod, max_crews
+
+PROD_MATRIX, MAX_CREWS_MATRIX = _build_worker_matrices()
+
+# Shared module state - read-only so no caller can silently alter the defaults
+PROD_MATRIX.flags.writeable = False
+MAX_CREWS_MATRIX.flags.writeable = False
+
+
 # =======================
 # EQUIPMENT RESOURCES
 # =======================
@@ -671,6 +709,17 @@ def validate_task_configuration() -> Dict[str, Any]:
         if discipline not in VALID_DISCIPLINES:
             warnings.append(f"Unknown discipline '{discipline}' in BASE_TASKS")
     
+    # Check values BASE_TASKS_SOA cannot represent (whole-day durations, known predecessors)
+    known_ids = set(task_ids)
+    for discipline, tasks in BASE_TASKS.items():
+        for task in tasks:
+            if task.base_duration is not None and task.base_duration != int(task.base_duration):
+                warnings.append(f"Fractional base_duration {task.base_duration} in task {task.id} "
+                                f"(truncated to {int(task.base_duration)} in BASE_TASKS_SOA)")
+            for pred in task.predecessors:
+                if pred not in known_ids:
+                    warnings.append(f"Unknown predecessor '{pred}' in task {task.id}")
+    
     return {
         "valid": len(issues) == 0,
         "task_count": len(task_ids),
@@ -693,6 +742,85 @@ if _CONFIG_VALIDATION["warnings"]:
     for warning in _CONFIG_VALIDATION["warnings"]:
         print(f"   ⚠️  {warning}")
 
+# =======================
+# TASK TABLE (STRUCT OF ARRAYS)
+# =======================
+
+@dataclass(frozen=True)
+class TaskTable:
+    """
+    Column-oriented view of BASE_TASKS: row i of every array describes ids[i].
+    
+    Categorical columns hold indices into the matching label tuple; predecessors are
+    stored CSR-style, so the predecessor rows of task i are
+    pred_indices[pred_indptr[i]:pred_indptr[i + 1]].
+    """
+    ids: tuple
+    index: Dict[str, int]
+    disciplines: tuple
+    resource_types: tuple
+    task_types: tuple
+    discipline_idx: np.ndarray   # int8
+    resource_idx: np.ndarray     # int8
+    task_type_idx: np.ndarray    # int8
+    base_duration: np.ndarray    # int32, -1 where the engine computes the duration
+    repeat_on_floor: np.ndarray  # uint8
+    included: np.ndarray         # uint8
+    pred_indptr: np.ndarray      # int32, len(ids) + 1
+    pred_indices: np.ndarray     # int32
+
+    def predecessors_of(self, i: int) -> np.ndarray:
+        """Row indices of task i's predecessors"""
+        return self.pred_indices[self.pred_indptr[i]:self.pred_indptr[i + 1]]
+
+def _build_task_table(base_tasks: Dict[str, List[BaseTask]]) -> TaskTable:
+    """Flatten base_tasks into a TaskTable in one pass over the task list"""
+    # Discipline comes from the BASE_TASKS key the task is filed under, like the DB seed rows
+    rows = [(discipline, task) for discipline, discipline_tasks in base_tasks.items() for task in discipline_tasks]
+    tasks = [task for _, task in rows]
+    ids = tuple(task.id for task in tasks)
+    index = {tid: i for i, tid in enumerate(ids)}
+    disciplines = tuple(base_tasks)
+    resource_types = tuple(sorted({task.resource_type for task in tasks}))
+    task_types = tuple(sorted({task.task_type for task in tasks}))
+    discipline_pos = {name: i for i, name in enumerate(disciplines)}
+    resource_pos = {name: i for i, name in enumerate(resource_types)}
+    task_type_pos = {name: i for i, name in enumerate(task_types)}
+
+    # Predecessor ids outside BASE_TASKS have no row to point at and are left out
+    # (reported by validate_task_configuration at import)
+    pred_rows = [[index[p] for p in task.predecessors if p in index] for task in tasks]
+    pred_indptr = np.zeros(len(tasks) + 1, dtype=np.int32)
+    np.cumsum([len(rows) for rows in pred_rows], out=pred_indptr[1:])
+
+    columns = dict(
+        discipline_idx=np.fromiter((discipline_pos[d] for d, _ in rows), np.int8, len(tasks)),
+        resource_idx=np.fromiter((resource_pos[t.resource_type] for t in tasks), np.int8, len(tasks)),
+        task_type_idx=np.fromiter((task_type_pos[t.task_type] for t in tasks), np.int8, len(tasks)),
+        # Whole days; fractional durations are truncated (reported by validate_task_configuration)
+        base_duration=np.fromiter(
+            (-1 if t.base_duration is None else t.base_duration for t in tasks), np.int32, len(tasks)
+        ),
+        repeat_on_floor=np.fromiter((t.repeat_on_floor for t in tasks), np.uint8, len(tasks)),
+        included=np.fromiter((t.included for t in tasks), np.uint8, len(tasks)),
+        pred_indptr=pred_indptr,
+        pred_indices=np.fromiter((p for rows in pred_rows for p in rows), np.int32, int(pred_indptr[-1])),
+    )
+    # Shared module state - read-only like the productivity matrices
+    for array in columns.values():
+        array.flags.writeable = False
+
+    return TaskTable(
+        ids=ids,
+        index=index,
+        disciplines=disciplines,
+        resource_types=resource_types,
+        task_types=task_types,
+        **columns,
+    )
+
+BASE_TASKS_SOA = _build_task_table(BASE_TASKS)
+
 # =======================
 # MODULE EXPORTS
 # =======================
@@ -702,8 +830,18 @@ __all__ = [
     'workers',
     'equipment',
     
+    # Worker productivity matrices
+    'WORKER_NAMES',
+    'TASK_IDS',
+    'WORKER_INDEX',
+    'TASK_INDEX',
+    'PROD_MATRIX',
+    'MAX_CREWS_MATRIX',
+    
     # Task definitions
     'BASE_TASKS',
+    'BASE_TASKS_SOA',
+    'TaskTable',
     
     # Scheduling configuration
     'acceleration',
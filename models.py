@@ -32,7 +32,7 @@ class EquipmentResource:
     type: str = "general"
     efficiency: float = 1.0
 
-@dataclass
+@dataclass(slots=True)
 class BaseTask:
     id: str
     name: str
@@ -2,14 +2,16 @@
 import sys
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.database import engine, SessionLocal
+from backend.database import engine, SessionLocal, insert_ignore_conflicts, row_exists
 from backend.db_models import Base, UserDB
-from backend.auth import AuthManager
+from backend.auth import hash_password
 import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -45,13 +47,17 @@ def safe_create_indexes():
                 "CREATE INDEX IF NOT EXISTS idx_task_discipline_included ON user_base_tasks (discipline, included)",
                 "CREATE INDEX IF NOT EXISTS idx_task_creator ON user_base_tasks (creator_id, created_at)",
                 "CREATE INDEX IF NOT EXISTS idx_user_tasks_user ON user_base_tasks (user_id, included)",
+                "CREATE INDEX IF NOT EXISTS idx_user_tasks_ordered ON user_base_tasks (user_id, discipline, sub_discipline, name)",
                 "CREATE INDEX IF NOT EXISTS idx_login_attempts_username_time ON login_attempts (username, attempt_time)",
                 "CREATE INDEX IF NOT EXISTS idx_login_attempts_time ON login_attempts (attempt_time)",
                 "CREATE INDEX IF NOT EXISTS idx_schedule_project ON schedules (project_id, zone, floor)",
                 "CREATE INDEX IF NOT EXISTS idx_schedule_dates ON schedules (start_date, end_date)",
                 "CREATE INDEX IF NOT EXISTS idx_schedule_status ON schedules (status, progress)",
+                "CREATE INDEX IF NOT EXISTS idx_schedule_active ON schedules (status, end_date) WHERE status IN ('scheduled', 'in_progress', 'delayed')",
                 "CREATE INDEX IF NOT EXISTS idx_monitoring_project ON monitoring (project_id, monitoring_date)",
                 "CREATE INDEX IF NOT EXISTS idx_monitoring_user ON monitoring (user_id, created_at)",
+                "CREATE INDEX IF NOT EXISTS idx_task_predecessors_gin ON user_base_tasks USING gin (predecessors)",
+                "CREATE INDEX IF NOT EXISTS idx_task_cross_floor_deps_gin ON user_base_tasks USING gin (cross_floor_dependencies)",
             ]
             
             for sql in indexes_sql:
@@ -69,14 +75,34 @@ def safe_create_indexes():
         logger.error(f"❌ Index creation failed: {e}")
         return False
 
+def drop_redundant_indexes():
+    """Drop single-column indexes already covered by a composite index's leading column"""
+    try:
+        with engine.connect() as conn:
+            redundant_indexes = [
+                "ix_schedules_project_id",   # covered by idx_schedule_project
+                "ix_monitoring_project_id",  # covered by idx_monitoring_project
+            ]
+            
+            for index_name in redundant_indexes:
+                try:
+                    conn.execute(sa.text(f"DROP INDEX IF EXISTS {index_name}"))
+                    logger.info(f"✅ Index {index_name} dropped or already absent")
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not drop {index_name}: {e}")
+            
+            conn.commit()
+            return True
+            
+    except Exception as e:
+        logger.error(f"❌ Dropping redundant indexes failed: {e}")
+        return False
+
 def create_default_users():
     """Create default users if none exist"""
     try:
         with SessionLocal() as session:
-            # Check if any users exist
-            user_count = session.query(UserDB).count()
-            
-            if user_count == 0:
+            if not row_exists(session, UserDB):
                 logger.info("Creating default users...")
                 
                 default_users = [
@@ -110,35 +136,33 @@ def create_default_users():
                     }
                 ]
                 
-                for user_data in default_users:
-                    # Check if user already exists
-                    existing_user = session.query(UserDB).filter(
-                        (UserDB.username == user_data["username"]) | 
-                        (UserDB.email == user_data["email"])
-                    ).first()
-                    
-                    if not existing_user:
-                        auth_manager = AuthManager(session)
-                        hashed_password = auth_manager.hash_password(user_data["password"])
-                        user = UserDB(
-                            username=user_data["username"],
-                            email=user_data["email"],
-                            hashed_password=hashed_password,
-                            full_name=user_data["full_name"],
-                            role=user_data["role"],
-                            is_active=True
-                        )
-                        session.add(user)
-                        logger.info(f"✅ Created user: {user_data['username']} ({user_data['role']})")
+                # PBKDF2 runs in hashlib's C code with the GIL released, so hashes compute in parallel
+                with ThreadPoolExecutor(max_workers=len(default_users)) as executor:
+                    hashes = list(executor.map(hash_password, [u["password"] for u in default_users]))
+                
+                rows = [
+                    {
+                        "username": user_data["username"],
+                        "email": user_data["email"],
+                        "hashed_password": hashed_password,
+                        "full_name": user_data["full_name"],
+                        "role": user_data["role"],
+                        "is_active": True
+                    }
+                    for user_data, hashed_password in zip(default_users, hashes)
+                ]
+                
+                # One INSERT; rows another process created meanwhile are skipped, not errors
+                insert_ignore_conflicts(session, UserDB, rows)
                 
                 session.commit()
                 logger.info("✅ Default users created successfully")
             else:
-                logger.info(f"✅ {user_count} users already exist in database")
+                logger.info("✅ Users already exist in database")
                 
         return True
-    except Exception as e:
-        logger.warning(f"Could not create default users: {e}")
+    except SQLAlchemyError as e:
+        logger.warning("Could not create default users: %s", e)
         return False
 
 
@@ -188,6 +212,42 @@ def migrate_null_duration_constraint():
         logger.error(f"❌ NULL duration migration failed: {e}")
         return False
 
+def migrate_json_columns_to_jsonb():
+    """Convert JSON columns from json (text) to jsonb"""
+    json_columns = [
+        ("user_base_tasks", "predecessors"),
+        ("user_base_tasks", "min_equipment_needed"),
+        ("user_base_tasks", "cross_floor_dependencies"),
+        ("schedules", "allocated_equipment"),
+        ("discipline_zone_config", "zone_groups"),
+    ]
+    try:
+        with engine.connect() as conn:
+            for table, column in json_columns:
+                # Check the current column type
+                result = conn.execute(sa.text("""
+                    SELECT data_type 
+                    FROM information_schema.columns 
+                    WHERE table_name = :table 
+                    AND column_name = :column
+                """), {"table": table, "column": column}).fetchone()
+                
+                if result and result[0] == "json":
+                    conn.execute(sa.text(f"""
+                        ALTER TABLE {table} 
+                        ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb
+                    """))
+                    logger.info(f"✅ Converted {table}.{column} to jsonb")
+                else:
+                    logger.info(f"✅ {table}.{column} already jsonb")
+            
+            conn.commit()
+            return True
+            
+    except Exception as e:
+        logger.error(f"❌ JSONB migration failed: {e}")
+        return False
+
 def migrate_database():
     """Safe database migration with existence checks"""
     try:
@@ -197,10 +257,18 @@ def migrate_database():
         if not safe_create_tables():
             return False
         
-        # Step 2: Safely create indexes
+        # Step 2: Convert JSON columns to jsonb (GIN indexes below need jsonb)
+        if not migrate_json_columns_to_jsonb():
+            logger.warning("JSONB migration had issues, but continuing...")
+        
+        # Step 2b: Safely create indexes
         if not safe_create_indexes():
             return False
         
+        # Step 2c: Drop indexes made redundant by composites
+        if not drop_redundant_indexes():
+            logger.warning("Redundant index cleanup had issues, but continuing...")
+        
         # Step 3: Migrate NULL duration constraint
         if not migrate_null_duration_constraint():
             logger.warning("NULL duration migration had issues, but continuing...")
@@ -4,7 +4,7 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from backend.db_models import Base, UserDB, BaseTaskDB
+from backend.db_models import Base, UserDB, UserBaseTaskDB
 from backend.auth import AuthManager
 
 @pytest.fixture(scope="function")
@@ -0,0 +1,76 @@
+import ast
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from backend import database_operations
+from backend.db_models import UserDB, UserBaseTaskDB
+
+OPERATIONS_FILE = Path(__file__).resolve().parent.parent / "backend" / "database_operations.py"
+
+class TestDatabaseOperationsModule:
+    def test_no_duplicate_function_definitions(self):
+        """Each top-level function must be defined exactly once"""
+        tree = ast.parse(OPERATIONS_FILE.read_text(encoding="utf-8"))
+        names = [node.name for node in tree.body if isinstance(node, ast.FunctionDef)]
+
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        assert duplicates == []
+
+class TestTaskCaches:
+    @pytest.fixture
+    def task_ids(self, test_session, sample_user_data, sample_task_data, monkeypatch):
+        """One user owning one task, with database_operations bound to the test database"""
+        monkeypatch.setattr(database_operations, "SessionLocal",
+                            sessionmaker(autoflush=False, bind=test_session.get_bind()))
+        database_operations.invalidate_task_cache()
+        
+        user = UserDB(**sample_user_data)
+        test_session.add(user)
+        test_session.flush()
+        task = UserBaseTaskDB(**sample_task_data, base_task_id="T1", user_id=user.id, creator_id=user.id)
+        test_session.add(task)
+        test_session.commit()
+        yield task.id, user.id
+        database_operations.invalidate_task_cache()
+
+    def test_filtered_columns_see_toggle(self, task_ids):
+        """Cached column projections are dropped when the user's tasks change"""
+        task_id, user_id = task_ids
+        columns = [UserBaseTaskDB.id, UserBaseTaskDB.included]
+        before = database_operations.get_user_tasks_with_filters(user_id, columns=columns)
+        assert [row.included for row in before] == [True]
+        
+        assert database_operations.toggle_task_inclusion(task_id, user_id)
+        
+        after = database_operations.get_user_tasks_with_filters(user_id, columns=columns)
+        assert [row.included for row in after] == [False]
+
+    def test_filtered_columns_see_save(self, task_ids):
+        """Updating through save_enhanced_task drops the user's cached projections"""
+        task_id, user_id = task_ids
+        columns = [UserBaseTaskDB.id, UserBaseTaskDB.name]
+        before = database_operations.get_user_tasks_with_filters(user_id, columns=columns)
+        assert [row.name for row in before] == ["Test Construction Task"]
+        
+        with database_operations.SessionLocal() as session:
+            task = database_operations.get_task_by_id(task_id, user_id, session=session)
+            assert database_operations.save_enhanced_task(
+                session, task, False, user_id, "Renamed Task", "T1", task.discipline, task.resource_type,
+                task.base_duration, task.min_crews_needed, task.delay, task.min_equipment_needed,
+                task.predecessors, {}, task.task_type, task.repeat_on_floor
+            )
+        
+        after = database_operations.get_user_tasks_with_filters(user_id, columns=columns)
+        assert [row.name for row in after] == ["Renamed Task"]
+
+    def test_filtered_objects_are_not_shared(self, task_ids):
+        """Full ORM results are loaded per call - callers may modify them in place"""
+        _, user_id = task_ids
+        first = database_operations.get_user_tasks_with_filters(user_id)
+        first[0].min_crews_needed = 99
+        
+        second = database_operations.get_user_tasks_with_filters(user_id)
+        assert second[0] is not first[0]
+        assert second[0].min_crews_needed == 2
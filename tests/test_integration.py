@@ -1,6 +1,10 @@
+import atexit
+import logging
+import sys
+
 import pytest
 from backend import SessionLocal, init_backend
-from backend.db_models import UserDB, BaseTaskDB
+from backend.db_models import UserDB, UserBaseTaskDB
 from backend.auth import AuthManager
 
 class TestIntegration:
@@ -29,7 +33,7 @@ class TestIntegration:
         assert auth_user.role == "manager"
         
         # Create task as this user
-        task = BaseTaskDB(
+        task = UserBaseTaskDB(
             name="Integration Test Task",
             discipline="Integration",
             resource_type="worker",
@@ -43,4 +47,28 @@ class TestIntegration:
         test_session.commit()
         
         assert task.id is not None
-        assert task.creator_id == user.id
\ No newline at end of file
+        assert task.creator_id == user.id
+
+class TestLoggingSetup:
+    def test_file_logging_survives_earlier_basic_config(self, tmp_path, monkeypatch):
+        """A basicConfig() elsewhere (e.g. scheduling_engin at import) must not disable backend.log"""
+        init_module = sys.modules["backend.init_backend"]
+        root = logging.getLogger()
+        monkeypatch.setattr(init_module, "LOG_DIR", str(tmp_path))
+        monkeypatch.setattr(init_module, "log_listener", None)
+        monkeypatch.setattr(root, "handlers", [logging.StreamHandler()])
+        monkeypatch.setattr(root, "level", root.level)
+        
+        init_module._configure_logging()
+        init_module._configure_logging()  # Already configured - no second handler or listener
+        listener = init_module.log_listener
+        try:
+            assert [h.get_name() for h in root.handlers].count(init_module._QUEUE_HANDLER_NAME) == 1
+            logging.getLogger("backend.tests").warning("file logging check")
+        finally:
+            listener.stop()
+            atexit.unregister(listener.stop)
+            for handler in listener.handlers:
+                handler.close()
+        
+        assert "file logging check" in (tmp_path / "backend.log").read_text(encoding="utf-8")
@@ -1,5 +1,5 @@
 import pytest
-from backend.db_models import UserDB, BaseTaskDB
+from backend.db_models import UserDB, UserBaseTaskDB
 
 class TestUserModel:
     def test_user_creation(self, test_session, sample_user_data):
@@ -29,7 +29,7 @@ class TestUserModel:
 class TestTaskModel:
     def test_base_task_creation(self, test_session, sample_task_data):
         """Test base task creation"""
-        task = BaseTaskDB(**sample_task_data)
+        task = UserBaseTaskDB(**sample_task_data)
         test_session.add(task)
         test_session.commit()
         
@@ -40,7 +40,7 @@ class TestTaskModel:
 
     def test_task_with_equipment(self, test_session):
         """Test task with equipment requirements"""
-        task = BaseTaskDB(
+        task = UserBaseTaskDB(
             name="Equipment Task",
             discipline="Terrassement",
             resource_type="worker",
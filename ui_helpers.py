@@ -7,7 +7,8 @@ from defaults import disciplines
 from models import DisciplineZoneConfig
 from backend.database_operations import (
     copy_default_tasks_to_user, save_enhanced_task, duplicate_task, 
-    delete_task, get_user_tasks_with_filters, get_user_task_count
+    delete_task, get_user_tasks_with_filters, get_user_task_count,
+    invalidate_task_cache
 )
 # ==================== CONSTRAINTS & CONFIGURATION ====================
 class SimpleConstraintManager:
@@ -59,6 +60,7 @@ def save_user_task(task, is_new, user_id, task_name, discipline, resource_type,
                 task.min_crews_needed = min_crews_needed
             
             session.commit()
+            invalidate_task_cache(user_id)
             st.success("✅ Task saved successfully!")
             st.session_state.pop("editing_task_id", None)
             st.session_state.pop("creating_new_task", None)
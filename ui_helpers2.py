@@ -4,18 +4,25 @@ import pandas as pd
 from backend.database import SessionLocal
 import json
 import logging
-from datetime import datetime
-from sqlalchemy import exists
+from sqlalchemy import exists, func, insert, select
 from sqlalchemy.orm import Session
 from backend.db_models import UserBaseTaskDB
 from defaults import BASE_TASKS, workers, equipment, disciplines
 from backend.database_operations import (
     copy_default_tasks_to_user, save_enhanced_task, duplicate_task, 
-    delete_task, get_user_tasks_with_filters, get_user_task_count
+    delete_task, get_user_tasks_with_filters, get_user_task_count, user_has_tasks,
+    invalidate_task_cache
 )
 from ui_helpers import cross_floor_dependency_ui #,get_task_by_id,get_floor_offset_text, remove_cross_floor_dependency, get_available_dependency_tasks,add_cross_floor_dependency
 logger = logging.getLogger(__name__)
 
+# Fields display_task_table reads - the list is loaded as a cached projection, not ORM objects
+_TASK_TABLE_COLUMNS = (
+    UserBaseTaskDB.id, UserBaseTaskDB.base_task_id, UserBaseTaskDB.name, UserBaseTaskDB.discipline,
+    UserBaseTaskDB.sub_discipline, UserBaseTaskDB.resource_type, UserBaseTaskDB.base_duration,
+    UserBaseTaskDB.min_crews_needed, UserBaseTaskDB.min_equipment_needed, UserBaseTaskDB.predecessors,
+)
+
 
 def enhanced_task_management():
     """Professional task management with auto-creation of default tasks"""
@@ -31,11 +38,8 @@ def enhanced_task_management():
         debug_task_system()
         return
     
-    # Check if user has any tasks
-    user_task_count = get_user_task_count(current_user_id)
-    
-    # Show empty state with import options
-    if user_task_count == 0:
+    # No tasks yet - show empty state with import options
+    if not user_has_tasks(current_user_id):
         show_empty_state(current_user_id, current_username, user_role)
         return
     
@@ -49,11 +53,14 @@ def reset_user_tasks_to_default(user_id: int, session, disciplines_to_reset: lis
     - disciplines_to_reset: if provided, only resets tasks of those disciplines
     - returns number of tasks restored
     """
-    restored_count = 0
-    # Fetch existing tasks to avoid duplicates
-    existing_tasks = session.query(UserBaseTaskDB).filter_by(user_id=user_id).all()
-    existing_keys = {(t.name, t.discipline, t.sub_discipline) for t in existing_tasks}
+    # Only the key columns are needed to detect duplicates
+    existing_keys = set(
+        session.query(UserBaseTaskDB.name, UserBaseTaskDB.discipline, UserBaseTaskDB.sub_discipline)
+        .filter_by(user_id=user_id)
+        .all()
+    )
 
+    rows = []
     for discipline, tasks_list in BASE_TASKS.items():
         if disciplines_to_reset and discipline not in disciplines_to_reset:
             continue
@@ -62,36 +69,35 @@ def reset_user_tasks_to_default(user_id: int, session, disciplines_to_reset: lis
             key = (t.name, t.discipline, t.sub_discipline)
             if key in existing_keys:
                 continue
-            # Insert into DB
-            user_task = UserBaseTaskDB(
-                base_task_id=t.id,
-                user_id=user_id,
-                name=t.name,
-                discipline=t.discipline,
-                sub_discipline=t.sub_discipline,
-                resource_type=t.resource_type,
-                task_type=t.task_type,
-                base_duration=t.base_duration or 1,
-                min_crews_needed=t.min_crews_needed or 1,
-                min_equipment_needed=t.min_equipment_needed or {},
-                predecessors=t.predecessors or [],
-                repeat_on_floor=t.repeat_on_floor,
-                included=True,
-                delay=t.delay,
-                cross_floor_dependencies=t.cross_floor_dependencies or [],
-                applies_to_floors=t.applies_to_floors,
-                max_duration=365,
-                max_crews=50,
-                created_by_user=False,
-                creator_id=None,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            session.add(user_task)
-            restored_count += 1
-
+            rows.append({
+                "base_task_id": t.id,
+                "user_id": user_id,
+                "name": t.name,
+                "discipline": t.discipline,
+                "sub_discipline": t.sub_discipline,
+                "resource_type": t.resource_type,
+                "task_type": t.task_type,
+                "base_duration": t.base_duration or 1,
+                "min_crews_needed": t.min_crews_needed or 1,
+                "min_equipment_needed": t.min_equipment_needed or {},
+                "predecessors": t.predecessors or [],
+                "repeat_on_floor": t.repeat_on_floor,
+                "included": True,
+                "delay": t.delay,
+                "cross_floor_dependencies": t.cross_floor_dependencies or [],
+                "applies_to_floors": t.applies_to_floors,
+                "max_duration": 365,
+                "max_crews": 50,
+                "created_by_user": False,
+                "creator_id": None
+            })
+
+    # One executemany INSERT instead of a flushed INSERT per task
+    if rows:
+        session.execute(insert(UserBaseTaskDB), rows)
     session.commit()
-    return restored_count
+    invalidate_task_cache(user_id)
+    return len(rows)
 
 
 def show_task_management_interface(user_id, user_role):
@@ -181,18 +187,11 @@ def show_task_management_interface(user_id, user_role):
         display_task_editor(user_id)
 
     # ------------------- Load and Display Tasks -------------------
-    tasks = get_user_tasks_with_filters(user_id, search_term, discipline_filter)
+    tasks = get_user_tasks_with_filters(user_id, search_term, discipline_filter, columns=_TASK_TABLE_COLUMNS)
 
     if not tasks:
         st.info("🔍 No tasks match your search criteria. Try different filters or create a new task.")
     else:
-        # Normalize fields before display
-        for t in tasks:
-            if t.min_crews_needed is None:
-                t.min_crews_needed = 1
-            if t.min_equipment_needed is None:
-                t.min_equipment_needed = {}
-
         display_task_table(tasks, user_id)
 
     # ------------------- Duplicate Task Handling -------------------
@@ -258,7 +257,7 @@ def _normalize_equipment_dict(equip):
 def display_task_table(tasks, user_id):
     """
     Professional table: shows stable ID (base_task_id) and uses DB PK for internal actions.
-    - tasks: list[UserBaseTaskDB]
+    - tasks: read-only rows with the _TASK_TABLE_COLUMNS fields (or UserBaseTaskDB objects)
     """
     if not tasks:
         st.info("📭 No tasks found matching your criteria.")
@@ -277,7 +276,7 @@ def display_task_table(tasks, user_id):
             "Sub": t.sub_discipline or "",
             "Resource": t.resource_type,
             "Duration": duration_display,
-            "Crews": t.min_crews_needed,
+            "Crews": t.min_crews_needed if t.min_crews_needed is not None else 1,
             "Equipment (#types)": equipment_count,
             "Predecessors": len(t.predecessors or []),
         })
@@ -619,9 +618,14 @@ def debug_task_system():
     """Debug function to check what's happening with tasks"""
     with SessionLocal() as session:
         # Check different types of tasks
-        total_tasks = session.query(UserBaseTaskDB).count()
-        system_tasks = session.query(UserBaseTaskDB).filter_by(created_by_user=False).count()
-        user_tasks = session.query(UserBaseTaskDB).filter_by(created_by_user=True).count()
+        # All three counts in one scan and one round-trip
+        total_tasks, system_tasks, user_tasks = session.execute(
+            select(
+                func.count(),
+                func.count().filter(UserBaseTaskDB.created_by_user == False),
+                func.count().filter(UserBaseTaskDB.created_by_user == True),
+            ).select_from(UserBaseTaskDB)
+        ).one()
         
         st.write(f"🔍 DEBUG - Total tasks in DB: {total_tasks}")
         st.write(f"🔍 DEBUG - System default tasks: {system_tasks}")
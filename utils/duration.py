@@ -42,7 +42,7 @@ class DurationCalculator:
                 logger.warning(f"⚠️ Invalid quantity {qty} for task {task.base_id}, defaulting to 1")
                 qty = 1.0
             
-            logger.debug(f"✅ Task {task.base_id}, floor {task.floor} quantity: {qty}")
+            logger.debug("✅ Task %s, floor %s quantity: %s", task.base_id, task.floor, qty)
             task.quantity = qty
             return float(qty)
             
@@ -218,6 +218,6 @@ class DurationCalculator:
             duration = 1.0
 
         duration_days = int(math.ceil(duration))
-        logger.debug(f"Task {task.id} duration: {duration_days} days")
+        logger.debug("Task %s duration: %s days", task.id, duration_days)
         
         return max(1, duration_days)
@@ -58,7 +58,7 @@ class AdvancedScheduler:
         ]
         
         if not pred_end_dates:
-            logger.debug(f"Task {task.id}: No scheduled predecessors found")
+            logger.debug("Task %s: No scheduled predecessors found", task.id)
             return self.calendar.current_date
             
         return max(pred_end_dates)